@@ -0,0 +1,143 @@
+import argparse
+import os
+import random
+import time
+import tracemalloc
+from math import inf
+from checkers_engine import Board, RED, BLACK
+from checkers_eval import DEFAULT_EVALUATOR
+from checkers_search import Searcher, ParallelSearcher, SearchStats, DIFFICULTY_LEVELS
+
+# --- Benchmark Positions ---
+# Fixed corpus in PDN FEN (squares 1-32, W = Red), taken from engine games after random openings.
+BENCH_CORPUS = [
+    ("opening", "B:W21,22,23,24,25,26,27,28,29,30,31,32:B1,2,3,4,5,6,7,8,9,10,11,12"),
+    ("opening", "B:W15,18,21,24,25,26,28,29,30,31,32:B2,3,4,5,6,7,8,9,10,11,12"),
+    ("opening", "B:W14,20,21,22,23,26,27,28,29,30,31,32:B1,2,3,5,6,7,8,10,11,12,13,16"),
+    ("opening", "B:W17,21,23,24,25,27,28,29,30,31,32:B2,3,4,5,6,7,8,11,12,14,15"),
+    ("middlegame", "B:W13,15,25,28,29,30,32:B3,4,5,6,7,8,9,12"),
+    ("middlegame", "B:W13,18,20,23,28,29,31,32:B5,6,7,8,9,11,12,16"),
+    ("middlegame", "B:W13,18,24,28,29,30,31,32:B4,5,6,7,8,9,11,12"),
+    ("middlegame", "B:W13,17,18,24,26,29,30,32:B4,5,6,7,8,9,10,12,23"),
+    ("endgame", "W:WK5,18,29,30:B16,21,22,27"),
+    ("endgame", "W:W23,K24,29,32:B13,16,K30"),
+    ("endgame", "B:WK1,17,29,30:B5,12,28"),
+    ("endgame", "W:WK5,13,17,22:BK9,K31,K32"),
+]
+PHASES = ("opening", "middlegame", "endgame")
+
+def bench_positions(count=6, seed=2024):
+    # Fixed, reproducible positions: seeded random playouts of growing length from the start.
+    rng, positions = random.Random(seed), []
+    for i in range(count):
+        board, turn = Board(), BLACK
+        for _ in range(6 + 4 * i):
+            moves = board.generate_moves(turn)
+            if not moves or board.winner() is not None: break
+            board.make_move(rng.choice(moves)); turn = RED if turn == BLACK else BLACK
+        positions.append((board, turn == BLACK))
+    return positions
+
+# --- Search Benchmark ---
+def run_search(board, turn, depth, time_ms, stats):
+    # Without a time budget the search still deepens one depth at a time to the full depth, so
+    # every iteration is recorded and the branching factor can be measured.
+    searcher = Searcher(); searcher.stats = stats
+    searcher.search(board, turn == BLACK, depth, inf if time_ms is None else time_ms)
+
+def peak_memory(fen, depth):
+    # Peak bytes allocated by one fixed-depth search, on a fresh board and table. The table is
+    # created after tracing starts, since its preallocated slots are most of the footprint.
+    board, turn = Board.from_fen(fen)
+    tracemalloc.start()
+    searcher = Searcher()
+    searcher.minimax(board, depth, -inf, inf, turn == BLACK)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak
+
+def bench_search(levels, fixed_depth, memory):
+    # Every corpus position is searched with a fresh Searcher at each difficulty level. With
+    # fixed_depth the time budgets are ignored, so node counts are comparable between runs.
+    print(f"{'level':<8} {'phase':<11} {'depth':>6} {'nodes':>9} {'kn/s':>7} {'cut':>5} {'1st':>5} {'ebf':>5} {'t->d ms':>8} {'peak KiB':>9}")
+    for label, max_depth, time_ms in levels:
+        for phase in PHASES:
+            fens = [fen for p, fen in BENCH_CORPUS if p == phase]
+            nodes = seconds = interior = cutoffs = first = 0; depths, ebfs, peak = [], [], 0
+            for fen in fens:
+                board, turn = Board.from_fen(fen)
+                stats = SearchStats()
+                run_search(board, turn, max_depth, None if fixed_depth else time_ms, stats)
+                nodes += stats.nodes; seconds += stats.seconds; depths.append(stats.depth)
+                interior += stats.interior; cutoffs += stats.cutoffs; first += stats.first_cutoffs
+                if stats.branching_factor(): ebfs.append(stats.branching_factor())
+                if memory: peak = max(peak, peak_memory(fen, stats.depth))
+            depth = f"{min(depths)}" if min(depths) == max(depths) else f"{min(depths)}-{max(depths)}"
+            print(f"{label:<8} {phase:<11} {depth:>6} {nodes:>9} {nodes / seconds / 1000 if seconds else 0:>7.1f} "
+                  f"{cutoffs / interior if interior else 0:>5.0%} {first / cutoffs if cutoffs else 0:>5.0%} "
+                  f"{sum(ebfs) / len(ebfs) if ebfs else 0:>5.2f} {seconds / len(fens) * 1000:>8.1f} "
+                  f"{peak / 1024 if memory else float('nan'):>9.0f}")
+
+# --- Board Operations ---
+def bench_ops(repeat):
+    positions = [Board.from_fen(fen) for _, fen in BENCH_CORPUS]
+    def make_unmake(board, turn):
+        for mv in board.generate_moves(turn): board.unmake_move(board.make_move(mv))
+    def all_valid_moves(board, turn):
+        board._legal_cache.clear(); board.get_all_valid_moves(turn)
+    ops = [("clone", lambda board, turn: board.clone()),
+           ("generate_moves", lambda board, turn: board.generate_moves(turn)),
+           ("get_all_valid_moves", all_valid_moves),
+           ("make+unmake all moves", make_unmake),
+           ("evaluate (material)", lambda board, turn: board.evaluate()),
+           ("Evaluator.evaluate", lambda board, turn: DEFAULT_EVALUATOR.evaluate(board)),
+           ("to_fen", lambda board, turn: board.to_fen(turn))]
+    print(f"{'operation':<22} {'us/call':>8}  ({len(positions)} positions x {repeat})")
+    for name, op in ops:
+        start = time.perf_counter()
+        for board, turn in positions:
+            for _ in range(repeat): op(board, turn)
+        print(f"{name:<22} {(time.perf_counter() - start) / (repeat * len(positions)) * 1e6:>8.2f}")
+
+# --- Parallel Speedup ---
+def bench_parallel(depth, max_workers):
+    positions = bench_positions()
+    serial = Searcher()
+    expected = [serial.minimax(board, depth, -inf, inf, maximizing)[1] for board, maximizing in positions]
+    print(f"Parallel root split, depth {depth}, {len(positions)} positions")
+    print(f"{'workers':>8} {'seconds':>9} {'speedup':>8} {'nodes':>10} {'same move':>10}")
+    base = None
+    for workers in range(1, max_workers + 1):
+        searcher = ParallelSearcher(workers)
+        warm_board, warm_max = positions[0]
+        searcher.minimax(warm_board, 2, -inf, inf, warm_max)  # spawn the pool processes before timing
+        start, nodes, same = time.perf_counter(), 0, 0
+        for (board, maximizing), move in zip(positions, expected):
+            same += searcher.minimax(board, depth, -inf, inf, maximizing)[1] == move
+            nodes += searcher.nodes
+        elapsed = time.perf_counter() - start
+        searcher.shutdown()
+        base = base or elapsed
+        print(f"{workers:>8} {elapsed:>9.3f} {base / elapsed:>7.2f}x {nodes:>10} {same:>6}/{len(positions)}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Checkers engine benchmarks")
+    sub = parser.add_subparsers(dest="command", required=True)
+    search = sub.add_parser("search", help="nodes/s, cutoffs, branching factor, time to depth and memory per difficulty level")
+    search.add_argument("--level", action="append", choices=[label for label, _, _ in DIFFICULTY_LEVELS], help="repeatable, default all")
+    search.add_argument("--fixed-depth", action="store_true", help="ignore the time budgets and search each level's full depth")
+    search.add_argument("--no-memory", action="store_true", help="skip the tracemalloc pass")
+    ops = sub.add_parser("ops", help="cost of the basic board operations")
+    ops.add_argument("--repeat", type=int, default=2000)
+    par = sub.add_parser("parallel", help="speedup of the parallel root search for 1..N workers")
+    par.add_argument("--depth", type=int, default=6)
+    par.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+    if args.command == "search":
+        levels = [level for level in DIFFICULTY_LEVELS if not args.level or level[0] in args.level]
+        bench_search(levels, args.fixed_depth, not args.no_memory)
+    elif args.command == "ops": bench_ops(args.repeat)
+    elif args.command == "parallel": bench_parallel(args.depth, args.workers)
+
+if __name__ == "__main__":
+    main()
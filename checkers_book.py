@@ -0,0 +1,125 @@
+import argparse
+import mmap
+import multiprocessing as mp
+import os
+import struct
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from math import inf
+from checkers_engine import Board, RED, BLACK, move_to_path, move_to_pdn, to_square
+from checkers_search import DIFFICULTY_LEVELS, Searcher
+
+# --- File Layout ---
+# A header followed by fixed-size records sorted by position key (Zobrist hash with the side
+# to move folded in), so a lookup is a binary search straight over the mapped file. A record
+# holds the book move as its origin and landing squares, padded with NO_SQUARE.
+BOOK_MAGIC, BOOK_VERSION = b"CKBK", 1
+DEFAULT_BOOK_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "checkers_book.bin")
+DEFAULT_BOOK_PLIES, DEFAULT_BOOK_DEPTH = 4, DIFFICULTY_LEVELS[-1][1]  # the AI only plays book moves at levels searching this deep
+MAX_PATH = 9  # origin plus up to eight landings
+NO_SQUARE = 0xFF
+HEADER = struct.Struct("<4sHHI")  # magic, version, search depth, number of records
+RECORD = struct.Struct(f"<QhB{MAX_PATH}B")  # key, score in hundredths, depth, squares
+KEY = struct.Struct("<Q")
+
+# --- Lookup ---
+class OpeningBook:
+    def __init__(self, path=DEFAULT_BOOK_PATH):
+        with open(path, "rb") as f: self.mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.depth, self.count = HEADER.unpack_from(self.mm, 0)
+        if magic != BOOK_MAGIC or version != BOOK_VERSION: raise ValueError(f"{path} is not a checkers opening book")
+
+    def probe(self, key):
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if KEY.unpack_from(self.mm, HEADER.size + mid * RECORD.size)[0] < key: lo = mid + 1
+            else: hi = mid
+        if lo == self.count: return None
+        record = RECORD.unpack_from(self.mm, HEADER.size + lo * RECORD.size)
+        return record if record[0] == key else None
+
+    def move(self, board, turn):
+        # The book move is matched against the legal moves, so a hash collision can never
+        # produce an illegal move.
+        record = self.probe(board.key(turn))
+        if record is None: return None
+        squares = tuple(sq for sq in record[3:] if sq != NO_SQUARE)
+        return next((mv for mv in board.legal_moves(turn) if mv[0] == squares[0] and mv[3] == squares[1:]), None)
+
+    def lookup(self, board, turn):
+        # The book move as a path of (row, col) squares, like a search result, or None.
+        mv = self.move(board, turn)
+        return mv and move_to_path(mv)
+
+    def close(self): self.mm.close()
+
+def open_book(path=DEFAULT_BOOK_PATH):
+    return OpeningBook(path) if path and os.path.exists(path) else None
+
+# --- Building ---
+_book_searcher = None
+
+def _init_book_worker():
+    global _book_searcher
+    _book_searcher = Searcher()
+
+def _book_record(board, turn, depth):
+    score, path = _book_searcher.minimax(board, depth, -inf, inf, turn == BLACK)
+    squares = [to_square(r, c) for r, c in path] + [NO_SQUARE] * (MAX_PATH - len(path))
+    return RECORD.pack(board.key(turn), max(-32768, min(32767, round(score * 100))), depth, *squares)
+
+def book_positions(plies):
+    # Every position reachable from the start in up to `plies` plies, whichever side is to move.
+    positions, frontier = {}, [(Board(), BLACK)]
+    for ply in range(plies + 1):
+        next_frontier = []
+        for board, turn in frontier:
+            key = board.key(turn)
+            if key in positions: continue
+            positions[key] = (board, turn)
+            if ply == plies: continue
+            for mv in board.legal_moves(turn):
+                child = board.clone(); child.make_move(mv)
+                next_frontier.append((child, RED if turn == BLACK else BLACK))
+        frontier = next_frontier
+    return [position for position in positions.values() if position[0].legal_moves(position[1])]
+
+def build_book(path, plies, depth, workers):
+    positions = book_positions(plies)
+    print(f"searching {len(positions)} positions to depth {depth} on {workers} workers", file=sys.stderr)
+    start, records = time.perf_counter(), []
+    with ProcessPoolExecutor(workers, mp_context=mp.get_context("spawn"), initializer=_init_book_worker) as pool:
+        futures = [pool.submit(_book_record, board, turn, depth) for board, turn in positions]
+        for done, future in enumerate(futures, 1):
+            records.append(future.result())
+            print(f"\r{done}/{len(positions)}  {time.perf_counter() - start:.0f}s", end="", file=sys.stderr, flush=True)
+    print(file=sys.stderr)
+    records.sort(key=lambda record: KEY.unpack_from(record)[0])
+    with open(path, "wb") as f:
+        f.write(HEADER.pack(BOOK_MAGIC, BOOK_VERSION, depth, len(records)))
+        f.writelines(records)
+
+def main():
+    parser = argparse.ArgumentParser(description="Checkers opening book")
+    sub = parser.add_subparsers(dest="command", required=True)
+    build = sub.add_parser("build", help="search every position near the start and store the chosen moves")
+    build.add_argument("--plies", type=int, default=DEFAULT_BOOK_PLIES, help="how far from the start position the book reaches")
+    build.add_argument("--depth", type=int, default=DEFAULT_BOOK_DEPTH, help="search depth for each book move")
+    build.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    build.add_argument("--out", default=DEFAULT_BOOK_PATH)
+    lookup = sub.add_parser("lookup", help="book move for a position given as PDN FEN")
+    lookup.add_argument("fen")
+    lookup.add_argument("--book", default=DEFAULT_BOOK_PATH)
+    args = parser.parse_args()
+    if args.command == "build":
+        build_book(args.out, args.plies, args.depth, args.workers)
+        print(f"wrote {args.out} ({os.path.getsize(args.out)} bytes)")
+    elif args.command == "lookup":
+        board, turn = Board.from_fen(args.fen)
+        mv = OpeningBook(args.book).move(board, turn)
+        print(move_to_pdn(mv) if mv else "not in book")
+
+if __name__ == "__main__":
+    main()
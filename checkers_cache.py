@@ -0,0 +1,101 @@
+import json
+import os
+import struct
+import threading
+import zlib
+from collections import OrderedDict
+from checkers_engine import to_rowcol, to_square
+from checkers_eval import DEFAULT_WEIGHTS
+
+# --- File Layout ---
+# A header, then one fixed-size record per entry, least recently used first. The header carries
+# a checksum of the evaluation weights: a file written under other weights is ignored.
+CACHE_MAGIC, CACHE_VERSION = b"CKAC", 1
+DEFAULT_CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "checkers_analysis.bin")
+DEFAULT_CACHE_ENTRIES = 50000
+MAX_PATH = 9  # origin plus up to eight landings
+NO_SQUARE = 0xFF
+HEADER = struct.Struct("<4sHII")  # magic, version, weights checksum, number of records
+RECORD = struct.Struct(f"<QdBB{MAX_PATH}B")  # key, score, depth reached, depth asked for, squares
+
+def weights_checksum(weights): return zlib.crc32(json.dumps(weights, sort_keys=True).encode())
+
+# --- Analysis Cache ---
+# Search results by position (Zobrist key with the side to move folded in): the score, the best
+# move as a (row, col) path, the depth the search reached and the depth it was asked for. The
+# least recently used entry goes once the capacity is reached. With a path the cache is saved
+# by save() and read back by start_loading() in a background thread, so startup never waits for
+# it: until the file is read, lookups only see what was stored since.
+class AnalysisCache:
+    def __init__(self, capacity=DEFAULT_CACHE_ENTRIES, path=None, weights=DEFAULT_WEIGHTS):
+        self.capacity, self.path = capacity, path
+        self.checksum = weights_checksum(weights)
+        self.entries = OrderedDict()
+        self.loaded, self.loader, self.lock = not path, None, threading.Lock()
+        self.hits = self.misses = 0
+
+    def start_loading(self):
+        if self.loaded or self.loader: return
+        self.loader = threading.Thread(target=self.load, daemon=True)
+        self.loader.start()
+
+    def get(self, key, depth, exact=False, legal=None):
+        # An entry answers any request for at most the depth its own search was asked for, even
+        # if a time budget stopped that search short of it: a new search would stop there too.
+        # With exact only a search asked for that very depth will do, so an AI move keeps to its
+        # difficulty instead of replaying a deeper search. legal, the paths of the position's legal
+        # moves, screens out an entry left by a key collision or a stale file: it is dropped.
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and legal is not None and entry[1] not in legal:
+                del self.entries[key]; entry = None
+            if entry is None or (entry[3] != depth if exact else entry[3] < depth):
+                self.misses += 1; return None
+            self.entries.move_to_end(key); self.hits += 1
+            return entry
+
+    def put(self, key, score, path, depth, asked):
+        with self.lock:
+            old = self.entries.get(key)
+            if old is None or asked >= old[3]: self.entries[key] = (score, path, depth, asked)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.capacity: self.entries.popitem(last=False)
+
+    def load(self):
+        # The file is parsed without the lock; only the merge holds it.
+        entries = OrderedDict()
+        try:
+            with open(self.path, "rb") as f: data = f.read()
+        except OSError: data = b""
+        if len(data) >= HEADER.size:
+            magic, version, checksum, count = HEADER.unpack_from(data)
+            if magic == CACHE_MAGIC and version == CACHE_VERSION and checksum == self.checksum:
+                for key, score, depth, asked, *squares in RECORD.iter_unpack(data[HEADER.size:HEADER.size + count * RECORD.size]):
+                    entries[key] = (score, tuple(to_rowcol(sq) for sq in squares if sq != NO_SQUARE), depth, asked)
+        with self.lock:
+            for key, entry in self.entries.items():  # anything stored before the file was read is newer
+                entries.pop(key, None); entries[key] = entry
+            self.entries = entries
+            while len(self.entries) > self.capacity: self.entries.popitem(last=False)
+            self.loaded = True
+
+    def save(self):
+        # Written to a temporary file and renamed, so an interrupted save keeps the old file.
+        # Returns False if the file could not be written; the cache itself is unaffected. A file
+        # never read is left alone, rather than replaced by this session's entries alone.
+        if self.loader: self.loader.join()
+        if not self.path or not self.loaded: return True
+        records = []
+        with self.lock: items = list(self.entries.items())
+        for key, (score, path, depth, asked) in items:
+            if len(path) > MAX_PATH: continue  # the rare longer capture chain is not kept on disk
+            squares = [to_square(r, c) for r, c in path] + [NO_SQUARE] * (MAX_PATH - len(path))
+            records.append(RECORD.pack(key, score, depth, asked, *squares))
+        temp = self.path + ".tmp"
+        try:
+            with open(temp, "wb") as f:
+                f.write(HEADER.pack(CACHE_MAGIC, CACHE_VERSION, self.checksum, len(records)))
+                f.writelines(records)
+            os.replace(temp, self.path)
+        except OSError: return False
+        return True
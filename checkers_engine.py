@@ -0,0 +1,275 @@
+import random
+
+# --- Constants ---
+ROWS, COLS = 8, 8
+EMPTY = 0
+RED, BLACK = 1, 2
+KING_R, KING_B = 3, 4
+
+# --- Bitboard Layout ---
+# The 32 playable (dark) squares are numbered row-major: sq = r*4 + c//2.
+# Even rows hold their dark squares on odd columns, odd rows on even columns,
+# so a diagonal step is a shift of 3, 4 or 5 depending on the row parity.
+FULL = 0xFFFFFFFF
+EVEN_ROWS = sum(0xF << (4 * r) for r in range(0, ROWS, 2))
+ODD_ROWS = FULL ^ EVEN_ROWS
+LEFT_EDGE = sum(1 << (4 * r) for r in range(1, ROWS, 2))
+RIGHT_EDGE = sum(1 << (4 * r + 3) for r in range(0, ROWS, 2))
+RED_START = sum(1 << s for s in range(20, 32))
+BLACK_START = sum(1 << s for s in range(0, 12))
+RED_KING_ROW = 0xF
+BLACK_KING_ROW = 0xF << 28
+
+# Each direction: (mask, shift) for even rows and (mask, shift) for odd rows.
+UL = (EVEN_ROWS, -4, ODD_ROWS & ~LEFT_EDGE, -5)
+UR = (EVEN_ROWS & ~RIGHT_EDGE, -3, ODD_ROWS, -4)
+DL = (EVEN_ROWS, 4, ODD_ROWS & ~LEFT_EDGE, 3)
+DR = (EVEN_ROWS & ~RIGHT_EDGE, 5, ODD_ROWS, 4)
+DIRECTIONS = (UL, UR, DL, DR)
+OPPOSITE = {UL: DR, UR: DL, DL: UR, DR: UL}
+RED_DIRS, BLACK_DIRS = (UL, UR), (DL, DR)
+
+def shift(bb, d):
+    m1, s1, m2, s2 = d
+    a, b = bb & m1, bb & m2
+    return ((a << s1 if s1 > 0 else a >> -s1) | (b << s2 if s2 > 0 else b >> -s2)) & FULL
+
+def to_square(r, c): return r * 4 + c // 2 if (r + c) % 2 == 1 else -1
+def to_rowcol(sq): r = sq >> 2; return r, 2 * (sq & 3) + (1 - (r & 1))
+
+def bits(bb):
+    while bb:
+        low = bb & -bb
+        yield low.bit_length() - 1
+        bb ^= low
+
+# NEIGHBOR[d][sq] is the square one diagonal step from sq in direction d, or -1 off the board.
+NEIGHBOR = {d: tuple((shift(1 << s, d).bit_length() - 1) for s in range(32)) for d in DIRECTIONS}
+
+def move_to_path(mv): return (to_rowcol(mv[0]),) + tuple(to_rowcol(sq) for sq in mv[3])
+def move_to_pdn(mv): return ("x" if mv[2] else "-").join(str(sq + 1) for sq in (mv[0],) + mv[3])  # squares numbered 1-32
+
+def hop_move(piece_pos, move_pos):
+    # A single step or single jump between two (row, col) squares, as a move tuple.
+    end = to_square(*move_pos)
+    if abs(piece_pos[0] - move_pos[0]) != 2: return to_square(*piece_pos), end, 0, (end,)
+    mid = to_square((piece_pos[0] + move_pos[0]) // 2, (piece_pos[1] + move_pos[1]) // 2)
+    return to_square(*piece_pos), end, 1 << mid, (end,)
+
+def _jump_chains(src, sq, opp, empty, dirs, king_row, captured, path, out):
+    # Captured pieces stay on the board until the move ends: they block landings and
+    # cannot be jumped twice. A man reaching the king row is crowned and the move ends.
+    found = False
+    for d in dirs:
+        step = NEIGHBOR[d][sq]
+        if step < 0 or not opp >> step & 1 or captured >> step & 1: continue
+        land = NEIGHBOR[d][step]
+        if land < 0 or not empty >> land & 1: continue
+        found = True
+        cap, hops = captured | 1 << step, path + (land,)
+        if (1 << land) & king_row or not _jump_chains(src, land, opp, empty, dirs, king_row, cap, hops, out):
+            out.append((src, land, cap, hops))
+    return found
+
+# --- Zobrist Keys ---
+# Fixed seed so keys are stable across runs. ZOBRIST[piece][sq] for piece in RED..KING_B.
+_zobrist_rng = random.Random(0xC0FFEE)
+ZOBRIST = [None] + [tuple(_zobrist_rng.getrandbits(64) for _ in range(32)) for _ in (RED, BLACK, KING_R, KING_B)]
+ZOBRIST_BLACK_TO_MOVE = _zobrist_rng.getrandbits(64)
+
+# --- Game Logic Class ---
+class Board:
+    def __init__(self):
+        self.red = self.black = self.kings = 0
+        self.red_left = self.black_left = 12
+        self.red_kings = self.black_kings = 0
+        self.hash = 0
+        self._legal_cache = {}
+        self.create_board()
+
+    def clone(self):
+        new_board = Board.__new__(Board)
+        new_board.red, new_board.black, new_board.kings = self.red, self.black, self.kings
+        new_board.red_left, new_board.black_left = self.red_left, self.black_left
+        new_board.red_kings, new_board.black_kings = self.red_kings, self.black_kings
+        new_board.hash = self.hash
+        new_board._legal_cache = {}
+        return new_board
+
+    def create_board(self):
+        self.red, self.black, self.kings = RED_START, BLACK_START, 0
+        self.update_counts(); self.update_hash()
+
+    def update_counts(self):
+        self.red_left, self.black_left = self.red.bit_count(), self.black.bit_count()
+        self.red_kings, self.black_kings = (self.red & self.kings).bit_count(), (self.black & self.kings).bit_count()
+
+    def update_hash(self):
+        h = 0
+        for sq in bits(self.red | self.black): h ^= ZOBRIST[self.get_piece(*to_rowcol(sq))][sq]
+        self.hash = h
+
+    def key(self, color): return self.hash ^ ZOBRIST_BLACK_TO_MOVE if color == BLACK else self.hash
+
+    def move(self, piece_pos, move_pos):
+        mv = hop_move(piece_pos, move_pos)
+        self.make_move(mv)
+        return bool(mv[2])
+
+    # --- Make / Unmake ---
+    # A move is (src, dst, captured_mask, path): path lists every landing square, so a whole
+    # capture chain is one move. make_move applies it in place and returns an undo record
+    # (move, captured_kings_mask, promoted) that unmake_move uses to restore the position.
+    def make_move(self, mv):
+        src, dst, cap = mv[0], mv[1], mv[2]
+        s, t = 1 << src, 1 << dst
+        is_red, was_king = self.red & s, self.kings & s
+        # A king may finish a capture circle on its own square, so clear src before setting dst.
+        if is_red: self.red = self.red & ~s | t
+        else: self.black = self.black & ~s | t
+        if was_king: self.kings = self.kings & ~s | t
+
+        cap_kings = self.kings & cap
+        if cap:
+            n, k = cap.bit_count(), cap_kings.bit_count()
+            self.kings ^= cap_kings
+            if is_red: self.black ^= cap; self.black_left -= n; self.black_kings -= k
+            else: self.red ^= cap; self.red_left -= n; self.red_kings -= k
+
+        promoted = not was_king and bool(t & (RED_KING_ROW if is_red else BLACK_KING_ROW))
+        if promoted:
+            self.kings |= t
+            if is_red: self.red_kings += 1
+            else: self.black_kings += 1
+
+        piece = (KING_R if was_king else RED) if is_red else (KING_B if was_king else BLACK)
+        self.hash ^= ZOBRIST[piece][src] ^ ZOBRIST[piece + 2 if promoted else piece][dst]
+        if cap: self._hash_captures(cap, cap_kings, BLACK if is_red else RED)
+        return mv, cap_kings, promoted
+
+    def unmake_move(self, undo):
+        mv, cap_kings, promoted = undo
+        src, dst, cap = mv[0], mv[1], mv[2]
+        s, t = 1 << src, 1 << dst
+        is_red = self.red & t
+        landed = (KING_R if self.kings & t else RED) if is_red else (KING_B if self.kings & t else BLACK)
+        self.hash ^= ZOBRIST[landed - 2 if promoted else landed][src] ^ ZOBRIST[landed][dst]
+        if cap: self._hash_captures(cap, cap_kings, BLACK if is_red else RED)
+        if promoted:
+            self.kings ^= t
+            if is_red: self.red_kings -= 1
+            else: self.black_kings -= 1
+        if is_red: self.red = self.red & ~t | s
+        else: self.black = self.black & ~t | s
+        if self.kings & t: self.kings = self.kings & ~t | s
+
+        if cap:
+            n, k = cap.bit_count(), cap_kings.bit_count()
+            self.kings |= cap_kings
+            if is_red: self.black |= cap; self.black_left += n; self.black_kings += k
+            else: self.red |= cap; self.red_left += n; self.red_kings += k
+
+    def _hash_captures(self, cap, cap_kings, color):
+        man, king = (RED, KING_R) if color == RED else (BLACK, KING_B)
+        for sq in bits(cap): self.hash ^= ZOBRIST[king if cap_kings >> sq & 1 else man][sq]
+
+    # --- FEN ---
+    # PDN FEN such as "B:W21,22,K30:B1,2,3": side to move, then each side's squares numbered
+    # 1-32 with K marking kings. Black moves first as usual; Red plays the White pieces.
+    def to_fen(self, turn):
+        sides = [letter + ",".join(("K" if self.kings >> sq & 1 else "") + str(sq + 1) for sq in bits(pieces))
+                 for letter, pieces in (("W", self.red), ("B", self.black))]
+        return ("B" if turn == BLACK else "W") + ":" + ":".join(sides)
+
+    @classmethod
+    def from_fen(cls, fen):
+        board = cls.__new__(cls)
+        board.red = board.black = board.kings = 0; board._legal_cache = {}
+        turn, *sides = fen.strip().rstrip(".").split(":")
+        for side in sides:
+            for token in filter(None, side[1:].split(",")):
+                bit = 1 << (int(token.lstrip("Kk")) - 1)
+                if side[0] in "Ww": board.red |= bit
+                else: board.black |= bit
+                if token[0] in "Kk": board.kings |= bit
+        board.update_counts(); board.update_hash()
+        return board, BLACK if turn.upper() == "B" else RED
+
+    def get_piece(self, r, c):
+        sq = to_square(r, c)
+        if sq < 0: return EMPTY
+        b = 1 << sq
+        if self.red & b: return KING_R if self.kings & b else RED
+        if self.black & b: return KING_B if self.kings & b else BLACK
+        return EMPTY
+
+    def _pieces(self, color): return (self.red, self.black) if color == RED else (self.black, self.red)
+
+    def _movers(self, color):
+        # Shift the empty squares back towards the movers: one step finds simple moves,
+        # two steps through an opponent piece find jumps.
+        own, opp = self._pieces(color)
+        empty = ~(self.red | self.black) & FULL
+        men_dirs = RED_DIRS if color == RED else BLACK_DIRS
+        jumps, moves = {}, {}
+        for d in DIRECTIONS:
+            pieces = own if d in men_dirs else own & self.kings
+            if not pieces: continue
+            back = OPPOSITE[d]
+            jumps[d] = shift(shift(empty, back) & opp, back) & pieces
+            moves[d] = shift(empty, back) & pieces
+        return jumps, moves
+
+    def generate_moves(self, color):
+        jumps, moves = self._movers(color)
+        union, result = 0, []
+        for bb in jumps.values(): union |= bb
+        if union:
+            # Jumps are compulsory and a capture chain must be followed to the end, so every
+            # jump move is a maximal chain, found depth-first from each piece that can jump.
+            own, opp = self._pieces(color)
+            empty = ~(self.red | self.black) & FULL
+            men_dirs, king_row = (RED_DIRS, RED_KING_ROW) if color == RED else (BLACK_DIRS, BLACK_KING_ROW)
+            for sq in bits(union):
+                if self.kings >> sq & 1: _jump_chains(sq, sq, opp, empty | 1 << sq, DIRECTIONS, 0, 0, (), result)
+                else: _jump_chains(sq, sq, opp, empty | 1 << sq, men_dirs, king_row, 0, (), result)
+            return result
+        for bb in moves.values(): union |= bb
+        for sq in bits(union):
+            for d, bb in moves.items():
+                if bb >> sq & 1:
+                    step = NEIGHBOR[d][sq]
+                    result.append((sq, step, 0, (step,)))
+        return result
+
+    def get_all_valid_moves(self, color):
+        all_moves = {}
+        for mv in self.legal_moves(color):
+            (r1, c1), (r2, c2) = to_rowcol(mv[0]), to_rowcol(mv[3][0])
+            all_moves.setdefault((r1, c1), {})[(r2, c2)] = ((r1 + r2) // 2, (c1 + c2) // 2) if mv[2] else None
+        return all_moves
+
+    def is_valid_square(self, r, c): return 0 <= r < ROWS and 0 <= c < COLS
+    def is_own_piece(self, p, color): return (color == RED and p in (RED, KING_R)) or (color == BLACK and p in (BLACK, KING_B))
+
+    def legal_moves(self, color):
+        # Cached per position and side, so the UI can ask every frame and only pays for move
+        # generation after the board changes. The list is shared: callers must not modify it.
+        position = (self.red, self.black, self.kings)
+        cached = self._legal_cache.get(color)
+        if cached is None or cached[0] != position:
+            cached = self._legal_cache[color] = (position, self.generate_moves(color))
+        return cached[1]
+
+    def winner(self, turn=None):
+        # With a side to move given, only that side running out of moves ends the game.
+        if self.red_left <= 0 or (turn != BLACK and not self.legal_moves(RED)): return BLACK
+        if self.black_left <= 0 or (turn != RED and not self.legal_moves(BLACK)): return RED
+        return None
+
+    def evaluate(self): return (self.black_left-self.red_left) + (self.black_kings*1.5-self.red_kings*1.5)
+
+    def minimax(self, board, depth, alpha, beta, maximizing_player):
+        # Kept for callers of the old API; the search itself is checkers_search.Searcher's.
+        from checkers_search import Searcher  # imported here: checkers_search imports this module
+        return Searcher().minimax(board, depth, alpha, beta, maximizing_player)
@@ -0,0 +1,220 @@
+import argparse
+import gzip
+import json
+import sys
+from checkers_engine import Board, RED, BLACK, FULL, EVEN_ROWS, ODD_ROWS, LEFT_EDGE, RIGHT_EDGE, bits, to_rowcol, move_to_pdn
+
+try:
+    import numpy as np
+except ImportError:  # the batch API falls back to scoring one position at a time
+    np = None
+
+# --- Features ---
+# The evaluation is linear: a weight per feature, each feature counted for Black minus Red.
+# Men and kings are material, back_rank counts men still guarding their own crowning row,
+# center counts pieces on the eight central squares, mobility counts empty squares a side can
+# step onto and runaway counts men close to crowning with no enemy piece left in front of them.
+FEATURES = ("man", "king", "back_rank", "center", "mobility", "runaway")
+DEFAULT_WEIGHTS = {"man": 1.0, "king": 2.5, "back_rank": 0.1, "center": 0.1, "mobility": 0.03, "runaway": 0.5}
+MATERIAL_WEIGHTS = {"man": 1.0, "king": 2.5, "back_rank": 0.0, "center": 0.0, "mobility": 0.0, "runaway": 0.0}
+# Scores are summed as integers in units of 1/WEIGHT_SCALE of a man and scaled once at the end,
+# so equal features always score equal and a symmetric position scores exactly 0.
+WEIGHT_SCALE = 10000
+
+BLACK_BACK_RANK, RED_BACK_RANK = 0xF, 0xF << 28
+CENTER = sum(1 << sq for sq in range(32) if 2 <= to_rowcol(sq)[0] <= 5 and 2 <= to_rowcol(sq)[1] <= 5)
+RUNAWAY_ROWS = 3
+BLACK_RUNAWAY_ZONE = sum(1 << sq for sq in range(32) if 7 - RUNAWAY_ROWS <= sq >> 2 < 7)
+RED_RUNAWAY_ZONE = sum(1 << sq for sq in range(32) if 0 < sq >> 2 <= RUNAWAY_ROWS)
+
+def _cone(sq, step):
+    # Every square a man on sq could still be stopped from: the widening triangle ahead of it.
+    r, c = to_rowcol(sq)
+    return sum(1 << s for s in range(32) if 0 < (to_rowcol(s)[0] - r) * step >= abs(to_rowcol(s)[1] - c))
+
+BLACK_CONE = {1 << sq: _cone(sq, 1) for sq in range(32)}  # keyed by the square's bit
+RED_CONE = {1 << sq: _cone(sq, -1) for sq in range(32)}
+
+# Diagonal steps as masked shifts (DIRECTIONS in checkers_engine, spelled out): every square
+# reachable by one step down or up from the pieces given. They work on ints and NumPy arrays.
+EVEN_NOT_RIGHT, ODD_NOT_LEFT = EVEN_ROWS & ~RIGHT_EDGE, ODD_ROWS & ~LEFT_EDGE
+
+def _down(pieces):
+    even, odd = pieces & EVEN_ROWS, pieces & ODD_ROWS
+    return (even << 4 | (even & EVEN_NOT_RIGHT) << 5 | (odd & ODD_NOT_LEFT) << 3 | odd << 4) & FULL
+
+def _up(pieces):
+    even, odd = pieces & EVEN_ROWS, pieces & ODD_ROWS
+    return even >> 4 | (even & EVEN_NOT_RIGHT) >> 3 | (odd & ODD_NOT_LEFT) >> 5 | odd >> 4
+
+def _mobility(black, red, kings):
+    # Empty squares each side can step onto.
+    empty = FULL ^ (black | red)
+    black_to, red_to = _down(black), _up(red)
+    if kings: black_to |= _up(black & kings); red_to |= _down(red & kings)
+    return (black_to & empty).bit_count() - (red_to & empty).bit_count()
+
+def _runaways(black, red, kings):
+    count = 0
+    men = black & ~kings & BLACK_RUNAWAY_ZONE
+    while men:
+        low = men & -men; men ^= low
+        if not red & BLACK_CONE[low]: count += 1
+    men = red & ~kings & RED_RUNAWAY_ZONE
+    while men:
+        low = men & -men; men ^= low
+        if not black & RED_CONE[low]: count -= 1
+    return count
+
+def features(board):
+    black, red, kings = board.black, board.red, board.kings
+    bm, bk, rm, rk = black & ~kings, black & kings, red & ~kings, red & kings
+    return (bm.bit_count() - rm.bit_count(), bk.bit_count() - rk.bit_count(),
+            (bm & BLACK_BACK_RANK).bit_count() - (rm & RED_BACK_RANK).bit_count(),
+            (black & CENTER).bit_count() - (red & CENTER).bit_count(),
+            _mobility(black, red, kings), _runaways(black, red, kings))
+
+# --- Evaluator ---
+class Evaluator:
+    def __init__(self, weights=None):
+        # Features tied to squares (material, back rank, center) are folded into one weight per
+        # square, then into tables indexed by each byte of a piece bitboard: 16 lookups score them.
+        self.weights = {**DEFAULT_WEIGHTS, **(weights or {})}
+        w = dict(zip(FEATURES, self.weight_vector()))
+        square_weights = (
+            [w["man"] + w["back_rank"] * (BLACK_BACK_RANK >> sq & 1) + w["center"] * (CENTER >> sq & 1) for sq in range(32)],
+            [w["king"] + w["center"] * (CENTER >> sq & 1) for sq in range(32)],
+            [-w["man"] - w["back_rank"] * (RED_BACK_RANK >> sq & 1) - w["center"] * (CENTER >> sq & 1) for sq in range(32)],
+            [-w["king"] - w["center"] * (CENTER >> sq & 1) for sq in range(32)])
+        self.tables = [[[sum(weights[8 * i + b] for b in range(8) if v >> b & 1) for v in range(256)] for i in range(4)]
+                       for weights in square_weights]
+        self.evaluate = _compile(self.tables, w["mobility"], w["runaway"])
+
+    def evaluate_batch(self, black, red, kings):
+        # Scores many positions, given as equal-length sequences of bitboards, in one call.
+        matrix = features_batch(black, red, kings)
+        if np is None: return [sum(w * f for w, f in zip(self.weight_vector(), row)) / WEIGHT_SCALE for row in matrix]
+        return (matrix.astype(np.int64) @ np.array(self.weight_vector(), dtype=np.int64)) / WEIGHT_SCALE
+
+    def weight_vector(self): return [round(self.weights[name] * WEIGHT_SCALE) for name in FEATURES]
+
+def _compile(tables, mobility, runaway):
+    # evaluate(board) is a closure with the lookups unrolled: it runs at every leaf, and a loop
+    # over the tables costs more than the lookups themselves.
+    (bm0, bm1, bm2, bm3), (bk0, bk1, bk2, bk3), (rm0, rm1, rm2, rm3), (rk0, rk1, rk2, rk3) = tables
+
+    def evaluate(board):
+        # Score from Black's side, equal to the weighted sum of features(board).
+        black, red, kings = board.black, board.red, board.kings
+        g = black & ~kings
+        score = bm0[g & 255] + bm1[g >> 8 & 255] + bm2[g >> 16 & 255] + bm3[g >> 24]
+        g = red & ~kings
+        score += rm0[g & 255] + rm1[g >> 8 & 255] + rm2[g >> 16 & 255] + rm3[g >> 24]
+        if kings:
+            g = black & kings
+            score += bk0[g & 255] + bk1[g >> 8 & 255] + bk2[g >> 16 & 255] + bk3[g >> 24]
+            g = red & kings
+            score += rk0[g & 255] + rk1[g >> 8 & 255] + rk2[g >> 16 & 255] + rk3[g >> 24]
+        if mobility: score += mobility * _mobility(black, red, kings)
+        if runaway and (black & ~kings & BLACK_RUNAWAY_ZONE or red & ~kings & RED_RUNAWAY_ZONE):
+            score += runaway * _runaways(black, red, kings)
+        return score / WEIGHT_SCALE
+    return evaluate
+
+DEFAULT_EVALUATOR = Evaluator()
+
+def load_weights(path):
+    with open(path, encoding="utf-8") as f: weights = json.load(f)
+    unknown = set(weights) - set(FEATURES)
+    if unknown: raise ValueError(f"unknown evaluation features: {', '.join(sorted(unknown))}")
+    return weights
+
+# --- Batched Features ---
+# The same features over arrays of positions with NumPy: one row per position, one column
+# per entry of FEATURES. Bit counts go through a byte table, like the scalar weights.
+if np is not None:
+    POPCOUNT8 = np.array([bin(v).count("1") for v in range(256)], dtype=np.int64)
+
+    def _popcount(bb):
+        return POPCOUNT8[bb & 255] + POPCOUNT8[bb >> 8 & 255] + POPCOUNT8[bb >> 16 & 255] + POPCOUNT8[bb >> 24 & 255]
+
+def features_batch(black, red, kings):
+    if np is None:
+        board = Board.__new__(Board)
+        rows = []
+        for board.black, board.red, board.kings in zip(black, red, kings): rows.append(features(board))
+        return rows
+    black, red, kings = (np.asarray(a, dtype=np.uint64) for a in (black, red, kings))
+    bm, bk, rm, rk = black & ~kings & FULL, black & kings, red & ~kings & FULL, red & kings
+    empty = ~(black | red) & FULL
+    mobility = _popcount((_down(black) | _up(bk)) & empty) - _popcount((_up(red) | _down(rk)) & empty)
+    runaway = np.zeros(len(black), dtype=np.int64)
+    for sq in bits(BLACK_RUNAWAY_ZONE): runaway += ((bm >> sq & 1) == 1) & ((red & BLACK_CONE[1 << sq]) == 0)
+    for sq in bits(RED_RUNAWAY_ZONE): runaway -= ((rm >> sq & 1) == 1) & ((black & RED_CONE[1 << sq]) == 0)
+    return np.stack([_popcount(bm) - _popcount(rm), _popcount(bk) - _popcount(rk),
+                     _popcount(bm & BLACK_BACK_RANK) - _popcount(rm & RED_BACK_RANK),
+                     _popcount(black & CENTER) - _popcount(red & CENTER), mobility, runaway], axis=1).astype(np.float64)
+
+# --- Tuning ---
+# Texel-style tuning from self-play results: every quiet position of every game is labelled
+# with the game's outcome for Black (1, 0.5, 0), and the weights are fitted so that a logistic
+# of the evaluation predicts it. The man weight stays fixed and sets the scale.
+def training_positions(records, skip_plies):
+    black, red, kings, labels = [], [], [], []
+    for record in records:
+        label = {"black": 1.0, "red": 0.0, "draw": 0.5}[record["result"]]
+        board, turn = Board(), BLACK
+        for ply, text in enumerate(record["moves"].split()):
+            moves = board.legal_moves(turn)
+            if ply >= skip_plies and not moves[0][2]:
+                black.append(board.black); red.append(board.red); kings.append(board.kings); labels.append(label)
+            board.make_move(next(mv for mv in moves if move_to_pdn(mv) == text)); turn = RED if turn == BLACK else BLACK
+    return black, red, kings, labels
+
+def tune(black, red, kings, labels, weights, iterations=2000, rate=1.0):
+    matrix, target = features_batch(black, red, kings), np.array(labels)
+    w = np.array([weights[name] for name in FEATURES], dtype=np.float64)
+    free = np.array([name != "man" for name in FEATURES])
+    def error(w, k): return np.mean((target - 1 / (1 + np.exp(-k * (matrix @ w)))) ** 2)
+    k = min(np.arange(0.1, 3.0, 0.05), key=lambda k: error(w, k))
+    for _ in range(iterations):
+        p = 1 / (1 + np.exp(-k * (matrix @ w)))
+        gradient = matrix.T @ ((p - target) * p * (1 - p)) * (2 * k / len(target))
+        w -= rate * np.where(free, gradient, 0.0)
+    return dict(zip(FEATURES, (round(float(v), 4) for v in w))), error(w, k)
+
+def main():
+    parser = argparse.ArgumentParser(description="Checkers evaluation: inspect and tune the feature weights")
+    sub = parser.add_subparsers(dest="command", required=True)
+    show = sub.add_parser("eval", help="features and score of a position given as PDN FEN")
+    show.add_argument("fen")
+    show.add_argument("--weights", help="JSON file of feature weights")
+    fit = sub.add_parser("tune", help="fit the weights to self-play results (JSON lines, may be gzipped)")
+    fit.add_argument("results", nargs="+")
+    fit.add_argument("--weights", help="starting weights, default the built-in ones")
+    fit.add_argument("--skip-plies", type=int, default=8, help="ignore the opening plies of each game")
+    fit.add_argument("--iterations", type=int, default=2000)
+    fit.add_argument("--out", default="-", help='weights file to write, "-" for stdout')
+    args = parser.parse_args()
+    weights = load_weights(args.weights) if args.weights else {}
+    if args.command == "eval":
+        board, turn = Board.from_fen(args.fen)
+        evaluator = Evaluator(weights)
+        for name, value in zip(FEATURES, features(board)): print(f"{name:<10} {value:>4} x {evaluator.weights[name]}")
+        print(f"score {evaluator.evaluate(board):+.3f} for Black")
+    elif args.command == "tune":
+        if np is None: sys.exit("tuning needs NumPy")
+        records = []
+        for path in args.results:
+            with (gzip.open if path.endswith(".gz") else open)(path, "rt") as f: records += [json.loads(line) for line in f if line.strip()]
+        black, red, kings, labels = training_positions(records, args.skip_plies)
+        print(f"{len(labels)} positions from {len(records)} games", file=sys.stderr)
+        fitted, err = tune(black, red, kings, labels, {**DEFAULT_WEIGHTS, **weights}, args.iterations)
+        print(f"mean squared error {err:.5f}", file=sys.stderr)
+        text = json.dumps(fitted, indent=2) + "\n"
+        if args.out == "-": sys.stdout.write(text)
+        else:
+            with open(args.out, "w", encoding="utf-8") as f: f.write(text)
+
+if __name__ == "__main__":
+    main()
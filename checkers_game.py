@@ -1,6 +1,13 @@
+import argparse
 import pygame
 import sys
-from math import inf
+import time
+from checkers_engine import Board, ROWS, COLS, EMPTY, RED, BLACK, KING_R, KING_B, hop_move, move_to_path, move_to_pdn, to_rowcol
+from checkers_book import open_book
+from checkers_cache import AnalysisCache, DEFAULT_CACHE_PATH
+from checkers_pdn import RESULTS, game_to_pdn, parse_pdn, replay
+from checkers_search import DIFFICULTY_LEVELS
+from checkers_worker import AIWorker
 
 # --- Constants & Configuration ---
 WIDTH, HEIGHT = 1200, 800
@@ -8,6 +15,7 @@ BOARD_SIZE = 640
 SIDEBAR_WIDTH = 340
 PADDING = 40
 BOARD_POS = (PADDING, (HEIGHT - BOARD_SIZE) // 2)
+SIDEBAR_X = BOARD_POS[0] + BOARD_SIZE + PADDING
 
 # Colors
 COLOR_BG = (17, 24, 39)
@@ -29,11 +37,23 @@ COLOR_SELECTED_GLOW = (59, 130, 246, 100)
 COLOR_HINT_GLOW = (22, 163, 74, 150)
 
 # Game Constants
-ROWS, COLS = 8, 8
 SQUARE_SIZE = BOARD_SIZE // COLS
-EMPTY = 0
-RED, BLACK = 1, 2
-KING_R, KING_B = 3, 4
+
+AI_MOVE_DELAY_MS, AI_JUMP_DELAY_MS = 300, 500
+HINT_DELAY_MS = 10000
+SAVE_PATH = "checkers_game.pdn"
+
+# Redraw: only regions whose content changed are repainted and pushed to the display, and the
+# loop sleeps in the event queue until input arrives or a timed update is due.
+# DIRTY_REDRAW = False restores the full repaint every tick.
+DIRTY_REDRAW = True
+FPS = 60
+AI_POLL_MS = 50
+BOARD_RECT = pygame.Rect(BOARD_POS[0]-10, BOARD_POS[1]-10, BOARD_SIZE+20, BOARD_SIZE+20)
+STATUS_RECT = pygame.Rect(SIDEBAR_X+20, BOARD_POS[1]+110, SIDEBAR_WIDTH-40, 40)
+HINT_LABEL_RECT = pygame.Rect(SIDEBAR_X+20, BOARD_POS[1]+260, SIDEBAR_WIDTH-40, 40)
+NOTICE_RECT = pygame.Rect(SIDEBAR_X+20, BOARD_POS[1]+320, SIDEBAR_WIDTH-40, 40)
+CAPTURED_RECT = pygame.Rect(BOARD_POS[0], BOARD_POS[1]+BOARD_SIZE+20, BOARD_SIZE, 30)
 
 # --- Sound Manager ---
 class SoundManager:
@@ -55,294 +75,370 @@ class SoundManager:
         elif sound_type == "capture" and self.capture_sound: self.capture_sound.play()
         elif sound_type == "win" and self.win_sound: self.win_sound.play()
 
-# --- Game Logic Class ---
-class Board:
-    def __init__(self):
-        self.board_state = []
-        self.red_left = self.black_left = 12
-        self.red_kings = self.black_kings = 0
-        self.create_board()
-
-    def clone(self):
-        new_board = Board()
-        new_board.board_state = [row[:] for row in self.board_state]
-        new_board.red_left, new_board.black_left = self.red_left, self.black_left
-        new_board.red_kings, new_board.black_kings = self.red_kings, self.black_kings
-        return new_board
-
-    def create_board(self):
-        self.board_state = [
-            [EMPTY, BLACK, EMPTY, BLACK, EMPTY, BLACK, EMPTY, BLACK],
-            [BLACK, EMPTY, BLACK, EMPTY, BLACK, EMPTY, BLACK, EMPTY],
-            [EMPTY, BLACK, EMPTY, BLACK, EMPTY, BLACK, EMPTY, BLACK],
-            [EMPTY, EMPTY, EMPTY, EMPTY, EMPTY, EMPTY, EMPTY, EMPTY],
-            [EMPTY, EMPTY, EMPTY, EMPTY, EMPTY, EMPTY, EMPTY, EMPTY],
-            [RED,   EMPTY, RED,   EMPTY, RED,   EMPTY, RED,   EMPTY],
-            [EMPTY, RED,   EMPTY, RED,   EMPTY, RED,   EMPTY, RED],
-            [RED,   EMPTY, RED,   EMPTY, RED,   EMPTY, RED,   EMPTY]
-        ]
-        self.red_left = self.black_left = 12
-        self.red_kings = self.black_kings = 0
-
-    def move(self, piece_pos, move_pos):
-        start_row, start_col = piece_pos
-        end_row, end_col = move_pos
-        piece = self.board_state[start_row][start_col]
-        self.board_state[end_row][end_col] = piece
-        self.board_state[start_row][start_col] = EMPTY
-
-        is_capture = abs(start_row - end_row) == 2
-        if is_capture:
-            mid_row, mid_col = (start_row + end_row) // 2, (start_col + end_col) // 2
-            if self.board_state[mid_row][mid_col] in (RED, KING_R): self.red_left -= 1
-            else: self.black_left -= 1
-            self.board_state[mid_row][mid_col] = EMPTY
-
-        self.check_for_promotion(end_row, end_col)
-        self.update_king_count()
-        return is_capture
-
-    def check_for_promotion(self, r, c):
-        p = self.get_piece(r, c)
-        if r == 0 and p == RED: self.board_state[r][c] = KING_R
-        if r == ROWS - 1 and p == BLACK: self.board_state[r][c] = KING_B
-
-    def update_king_count(self):
-        self.red_kings = sum(row.count(KING_R) for row in self.board_state)
-        self.black_kings = sum(row.count(KING_B) for row in self.board_state)
-
-    def get_piece(self, r, c): return self.board_state[r][c]
-
-    def get_all_valid_moves(self, color):
-        all_moves = {}
-        has_jump = any(self._get_jumps((r, c)) for r in range(ROWS) for c in range(COLS) if self.is_own_piece(self.get_piece(r, c), color))
-        
+# --- Render Cache ---
+# Everything that looks the same frame after frame is drawn once here and then only blitted:
+# the board with its frame, piece and king sprites, overlays, the static sidebar and text.
+TEXT_CACHE_LIMIT = 256
+
+class RenderCache:
+    def __init__(self, font_lg, font_sm):
+        frame = pygame.Surface((BOARD_SIZE+20, BOARD_SIZE+20)); frame.fill(COLOR_BG)
+        pygame.draw.rect(frame, (30,20,10), frame.get_rect(), border_radius=12)
         for r in range(ROWS):
             for c in range(COLS):
-                if self.is_own_piece(self.get_piece(r, c), color):
-                    moves = self._get_jumps((r, c)) if has_jump else self._get_regular_moves((r, c))
-                    if moves: all_moves[(r, c)] = moves
-        return all_moves
-
-    def _get_jumps(self, pos):
-        r, c = pos; p = self.get_piece(r, c); jumps = {}
-        move_dirs = [(-1,-1), (-1,1), (1,-1), (1,1)] if p in (KING_R,KING_B) else [(-1,-1), (-1,1)] if p==RED else [(1,-1), (1,1)]
-        for dr, dc in move_dirs:
-            mid_r, mid_c, end_r, end_c = r+dr, c+dc, r+2*dr, c+2*dc
-            if self.is_valid_square(end_r, end_c) and self.get_piece(end_r, end_c) == EMPTY and self.is_opponent(mid_r, mid_c, p):
-                jumps[(end_r, end_c)] = (mid_r, mid_c)
-        return jumps
-
-    def _get_regular_moves(self, pos):
-        r, c = pos; p = self.get_piece(r, c); moves = {}
-        move_dirs = [(-1,-1), (-1,1), (1,-1), (1,1)] if p in (KING_R,KING_B) else [(-1,-1), (-1,1)] if p==RED else [(1,-1), (1,1)]
-        for dr, dc in move_dirs:
-            end_r, end_c = r+dr, c+dc
-            if self.is_valid_square(end_r, end_c) and self.get_piece(end_r, end_c) == EMPTY:
-                moves[(end_r, end_c)] = None
-        return moves
-
-    def is_valid_square(self, r, c): return 0 <= r < ROWS and 0 <= c < COLS
-    def is_own_piece(self, p, color): return (color == RED and p in (RED, KING_R)) or (color == BLACK and p in (BLACK, KING_B))
-    def is_opponent(self, r, c, piece):
-        p = self.get_piece(r, c)
-        return p != EMPTY and not self.is_own_piece(p, RED if piece in (RED, KING_R) else BLACK)
-
-    def winner(self):
-        if self.red_left <= 0 or not self.get_all_valid_moves(RED): return BLACK
-        if self.black_left <= 0 or not self.get_all_valid_moves(BLACK): return RED
-        return None
-
-    def evaluate(self): return (self.black_left-self.red_left) + (self.black_kings*1.5-self.red_kings*1.5)
-
-    def minimax(self, board, depth, alpha, beta, maximizing_player):
-        if depth == 0 or board.winner() is not None:
-            return board.evaluate(), None
-        best_move = None
-        player_color = BLACK if maximizing_player else RED
-        if maximizing_player:
-            max_eval = -inf
-            for piece_pos, moves in board.get_all_valid_moves(player_color).items():
-                for move_pos in moves.keys():
-                    temp_board = board.clone(); temp_board.move(piece_pos, move_pos)
-                    evaluation = self.minimax(temp_board, depth-1, alpha, beta, False)[0]
-                    if evaluation > max_eval: max_eval, best_move = evaluation, (piece_pos, move_pos)
-                    alpha = max(alpha, evaluation)
-                    if beta <= alpha: break
-                if beta <= alpha: break
-            return max_eval, best_move
-        else:
-            min_eval = inf
-            for piece_pos, moves in board.get_all_valid_moves(player_color).items():
-                for move_pos in moves.keys():
-                    temp_board = board.clone(); temp_board.move(piece_pos, move_pos)
-                    evaluation = self.minimax(temp_board, depth-1, alpha, beta, True)[0]
-                    if evaluation < min_eval: min_eval, best_move = evaluation, (piece_pos, move_pos)
-                    beta = min(beta, evaluation)
-                    if beta <= alpha: break
-                if beta <= alpha: break
-            return min_eval, best_move
+                color = COLOR_LIGHT_SQUARE if (r+c)%2==0 else COLOR_DARK_SQUARE
+                pygame.draw.rect(frame, color, (10+c*SQUARE_SIZE, 10+r*SQUARE_SIZE, SQUARE_SIZE, SQUARE_SIZE))
+        self.board = frame.convert()
+
+        crown_font = pygame.font.SysFont("arial", 30, bold=True)
+        crown = crown_font.render('👑', True, COLOR_KING)
+        self.pieces = {}
+        for p_val in (RED, BLACK, KING_R, KING_B):
+            sprite = pygame.Surface((SQUARE_SIZE, SQUARE_SIZE), pygame.SRCALPHA)
+            center, radius = (SQUARE_SIZE//2, SQUARE_SIZE//2), SQUARE_SIZE//2 - 12
+            pygame.draw.circle(sprite, (0,0,0), (center[0], center[1]+4), radius)
+            pygame.draw.circle(sprite, COLOR_RED_PIECE if p_val in (RED, KING_R) else COLOR_BLACK_PIECE, center, radius)
+            if p_val in (KING_R, KING_B): sprite.blit(crown, crown.get_rect(center=center))
+            self.pieces[p_val] = sprite.convert_alpha()
+
+        self.hint_glow = pygame.Surface((SQUARE_SIZE, SQUARE_SIZE), pygame.SRCALPHA); self.hint_glow.fill(COLOR_HINT_GLOW)
+        self.selected_glow = pygame.Surface((SQUARE_SIZE, SQUARE_SIZE), pygame.SRCALPHA); self.selected_glow.fill(COLOR_SELECTED_GLOW)
+        self.move_marker = pygame.Surface((SQUARE_SIZE, SQUARE_SIZE), pygame.SRCALPHA)
+        pygame.draw.circle(self.move_marker, COLOR_VALID_MOVE, (SQUARE_SIZE//2, SQUARE_SIZE//2), 15)
+        self.overlay = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA); self.overlay.fill((0,0,0,180))
+
+        self.text_surfaces = {}
+        sidebar = pygame.Surface((SIDEBAR_WIDTH, 590)); sidebar.fill(COLOR_BG)
+        card1_rect, card2_rect = pygame.Rect(0, 0, SIDEBAR_WIDTH, 220), pygame.Rect(0, 240, SIDEBAR_WIDTH, 350)
+        pygame.draw.rect(sidebar, COLOR_CARD, card1_rect, border_radius=16)
+        pygame.draw.rect(sidebar, COLOR_CARD, card2_rect, border_radius=16)
+        for text, font, color, y in (("AI Checkers", font_lg, COLOR_TEXT, 45), ("A game of strategy", font_sm, COLOR_LABEL, 80)):
+            surf = self.text(text, font, color); sidebar.blit(surf, surf.get_rect(center=(card1_rect.centerx, y)))
+        self.sidebar = sidebar.convert()
+
+    def text(self, text, font, color):
+        key = (text, font, color)
+        surf = self.text_surfaces.get(key)
+        if surf is None:
+            if len(self.text_surfaces) >= TEXT_CACHE_LIMIT: self.text_surfaces.clear()
+            surf = self.text_surfaces[key] = font.render(text, True, color)
+        return surf
+
+# --- Frame Statistics ---
+# With --stats the time spent drawing and presenting each repainted frame is collected and
+# its percentiles printed every FRAME_STATS_EVERY frames and on exit.
+FRAME_STATS_EVERY = 300
+
+class FrameStats:
+    def __init__(self): self.times = []
+
+    def add(self, seconds):
+        self.times.append(seconds)
+        if len(self.times) >= FRAME_STATS_EVERY: self.report()
+
+    def report(self):
+        if not self.times: return
+        times, self.times = sorted(self.times), []
+        pct = lambda p: times[min(len(times) - 1, int(p * len(times)))] * 1000
+        print(f"frames {len(times)}  p50 {pct(0.5):.2f} ms  p90 {pct(0.9):.2f} ms  p99 {pct(0.99):.2f} ms  max {times[-1] * 1000:.2f} ms")
 
 # --- UI Classes ---
 class Button:
     def __init__(self, rect, text, normal_color, hover_color, font, callback):
         self.rect, self.text, self.font, self.callback = rect, text, font, callback
         self.normal_color, self.hover_color = normal_color, hover_color
+        self.text_surf = font.render(text, True, COLOR_TEXT)
     def draw(self, screen, mouse_pos):
         color = self.hover_color if self.rect.collidepoint(mouse_pos) else self.normal_color
         pygame.draw.rect(screen, color, self.rect, border_radius=10)
-        text_surf = self.font.render(self.text, True, COLOR_TEXT)
-        screen.blit(text_surf, text_surf.get_rect(center=self.rect.center))
+        screen.blit(self.text_surf, self.text_surf.get_rect(center=self.rect.center))
+    def view_key(self, mouse_pos): return (self.text, self.rect.collidepoint(mouse_pos))
     def handle_event(self, event):
         if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1 and self.rect.collidepoint(event.pos): self.callback()
 
 # --- Main Game Class ---
 class Game:
-    def __init__(self, screen):
+    def __init__(self, screen, stats=False, cache_path=DEFAULT_CACHE_PATH):
         self.screen = screen
         self.sounds = SoundManager()
+        self.ai = AIWorker(stats); self.ai_job = None; self.game_id = 0
+        self.book = open_book()
+        self.analysis = AnalysisCache(path=cache_path)
+        self.analysis.start_loading()
+        self.frame_stats = FrameStats() if stats else None
+        self.drawn_layer, self.drawn_regions = None, []
+        self.init_fonts_and_ui()
         self.reset_to_menu()
     
     def init_fonts_and_ui(self):
         self.font_sm = pygame.font.SysFont("inter", 18); self.font_md = pygame.font.SysFont("inter", 22, bold=True)
         self.font_lg = pygame.font.SysFont("inter", 32, bold=True); self.font_title = pygame.font.SysFont("inter", 60, bold=True)
-        self.init_menu_buttons(); self.init_game_buttons()
+        self.render_cache = RenderCache(self.font_lg, self.font_sm)
+        self.init_game_buttons()
 
     def init_menu_buttons(self):
         self.menu_buttons = [
             Button(pygame.Rect(WIDTH//2-150, HEIGHT//2-80, 300, 50), "Player vs AI", COLOR_GREEN, tuple(min(255,c+20) for c in COLOR_GREEN), self.font_md, lambda: self.start_game("ai")),
             Button(pygame.Rect(WIDTH//2-150, HEIGHT//2-10, 300, 50), "2 Players", COLOR_BLUE, tuple(min(255,c+20) for c in COLOR_BLUE), self.font_md, lambda: self.start_game("2p")),
             Button(pygame.Rect(WIDTH//2-150, HEIGHT//2+60, 300, 50), "Training Mode (Hints)", COLOR_PURPLE, tuple(min(255,c+20) for c in COLOR_PURPLE), self.font_md, lambda: self.start_game("training")),
-            Button(pygame.Rect(WIDTH//2-150, HEIGHT//2+130, 300, 40), f"Difficulty: {'Easy' if self.difficulty==2 else 'Medium' if self.difficulty==4 else 'Hard'}", COLOR_GHOST, COLOR_BORDER, self.font_sm, self.toggle_difficulty)
+            Button(pygame.Rect(WIDTH//2-150, HEIGHT//2+130, 300, 40), f"Difficulty: {DIFFICULTY_LEVELS[self.difficulty][0]}", COLOR_GHOST, COLOR_BORDER, self.font_sm, self.toggle_difficulty)
         ]
 
     def init_game_buttons(self):
-        sidebar_x = BOARD_POS[0] + BOARD_SIZE + PADDING
         self.game_buttons = [
-            Button(pygame.Rect(sidebar_x+PADDING, BOARD_POS[1]+160, 140, 50), "Main Menu", COLOR_GREEN, tuple(min(255,c+20) for c in COLOR_GREEN), self.font_md, self.reset_to_menu),
-            Button(pygame.Rect(sidebar_x+PADDING+160, BOARD_POS[1]+160, 100, 50), "Undo", COLOR_GHOST, COLOR_BORDER, self.font_md, self.undo_move),
-            Button(pygame.Rect(sidebar_x+PADDING, BOARD_POS[1]+520, SIDEBAR_WIDTH-80, 50), "How to Play", COLOR_GHOST, COLOR_BORDER, self.font_md, lambda: setattr(self, 'show_instructions', True))
+            Button(pygame.Rect(SIDEBAR_X+PADDING, BOARD_POS[1]+160, SIDEBAR_WIDTH-80, 50), "Main Menu", COLOR_GREEN, tuple(min(255,c+20) for c in COLOR_GREEN), self.font_md, self.reset_to_menu),
+            Button(pygame.Rect(SIDEBAR_X+PADDING, BOARD_POS[1]+390, 125, 50), "Save PDN", COLOR_GHOST, COLOR_BORDER, self.font_md, self.save_game),
+            Button(pygame.Rect(SIDEBAR_X+PADDING+135, BOARD_POS[1]+390, 125, 50), "Load PDN", COLOR_GHOST, COLOR_BORDER, self.font_md, self.load_game),
+            Button(pygame.Rect(SIDEBAR_X+PADDING, BOARD_POS[1]+455, 125, 50), "Undo", COLOR_GHOST, COLOR_BORDER, self.font_md, self.undo_move),
+            Button(pygame.Rect(SIDEBAR_X+PADDING+135, BOARD_POS[1]+455, 125, 50), "Redo", COLOR_GHOST, COLOR_BORDER, self.font_md, self.redo_move),
+            Button(pygame.Rect(SIDEBAR_X+PADDING, BOARD_POS[1]+520, SIDEBAR_WIDTH-80, 50), "How to Play", COLOR_GHOST, COLOR_BORDER, self.font_md, lambda: setattr(self, 'show_instructions', True))
         ]
 
     def start_game(self, mode):
         self.game_mode = mode; self.reset()
         
     def reset(self):
+        self.cancel_ai(); self.game_id += 1
         self.board = Board(); self.turn = BLACK; self.selected_piece, self.valid_moves, self.winner = None, {}, None
-        self.history = []; self.best_move_hint = None; self.game_state = "PLAYING"
+        self.chain_moves, self.chain_undos = [], []
+        self.history, self.redo_moves, self.start_fen, self.notice = [], [], None, None
+        self.best_move_hint = None; self.game_state = "PLAYING"
         self.turn_start_time = pygame.time.get_ticks()
         if self.game_mode == 'training' and self.turn == RED: self.calculate_hint()
 
     def reset_to_menu(self):
-        self.game_state = "MENU"; self.difficulty = 4; self.show_instructions = False
-        self.init_fonts_and_ui()
+        self.cancel_ai(); self.game_state = "MENU"; self.difficulty = 1; self.show_instructions = False
+        self.init_menu_buttons()
+
+    def quit(self):
+        if self.frame_stats:
+            self.frame_stats.report()
+            print(f"analysis cache: {self.analysis.hits} hits, {self.analysis.misses} misses, {len(self.analysis.entries)} entries")
+        try:
+            if not self.analysis.save(): print(f"Warning: could not write the analysis cache to {self.analysis.path}.")
+        finally:
+            self.ai.shutdown(); pygame.quit(), sys.exit()
 
     def run(self):
         clock = pygame.time.Clock()
         while True:
-            clock.tick(60)
-            if self.game_state == "MENU": self.run_menu()
-            elif self.game_state == "PLAYING": self.run_game()
-            elif self.game_state == "GAME_OVER": self.run_game_over()
-    
-    def run_menu(self):
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT: pygame.quit(), sys.exit()
+            clock.tick(FPS)
+            self.frame(self.wait_events())
+
+    def frame(self, events):
+        if any(event.type in (pygame.WINDOWEXPOSED, pygame.VIDEOEXPOSE) for event in events): self.drawn_layer = None
+        if self.game_state == "MENU": self.run_menu(events)
+        elif self.game_state == "PLAYING": self.run_game(events)
+        elif self.game_state == "GAME_OVER": self.run_game_over(events)
+
+    # --- Event-Driven Redraw ---
+    def wait_events(self):
+        events = pygame.event.get()
+        if events or not DIRTY_REDRAW: return events
+        wake = self.next_wakeup()
+        if wake is None: timeout = 0 # Nothing scheduled: sleep until the next event
+        else:
+            timeout = wake - pygame.time.get_ticks()
+            if timeout <= 0: return []
+        event = pygame.event.wait(timeout)
+        return [] if event.type == pygame.NOEVENT else [event] + pygame.event.get()
+
+    def next_wakeup(self):
+        # Earliest tick at which the game changes without input: AI polling and its move delays,
+        # the "thinking" animation and the idle hint timer.
+        if self.drawn_layer is None or self.drawn_layer[0] != self.game_state: return pygame.time.get_ticks()
+        if self.game_state != "PLAYING" or self.winner: return None
+        if self.ai_job is not None: return pygame.time.get_ticks() + AI_POLL_MS
+        if self.is_ai_turn():
+            if self.ai_chain: return self.ai_next_step
+            return self.turn_start_time + AI_MOVE_DELAY_MS if self.ai_result else pygame.time.get_ticks()
+        if self.game_mode in ["ai", "2p"] and not self.best_move_hint: return self.turn_start_time + HINT_DELAY_MS
+        return None
+
+    def present(self, draw, layer, regions):
+        # Repaint everything when the layer (screen, overlay) changes, otherwise only the regions
+        # whose view key changed, clipping the normal draw call to each of them.
+        if not DIRTY_REDRAW or layer != self.drawn_layer: dirty = [self.screen.get_rect()]
+        else: dirty = [rect for (rect, key), old in zip(regions, self.drawn_regions) if key != old[1]]
+        self.drawn_layer, self.drawn_regions = layer, regions
+        if not dirty: return
+        start = time.perf_counter()
+        for rect in dirty:
+            self.screen.set_clip(rect); draw()
+        self.screen.set_clip(None)
+        pygame.display.update(dirty)
+        if self.frame_stats: self.frame_stats.add(time.perf_counter() - start)
+
+    def game_regions(self, mouse_pos):
+        board = self.board
+        return [(BOARD_RECT, (board.red, board.black, board.kings, self.selected_piece, tuple(self.valid_moves), self.visible_hint())),
+                (STATUS_RECT, self.get_status_info()), (HINT_LABEL_RECT, self.ai_job == "hint"), (NOTICE_RECT, self.notice),
+                (CAPTURED_RECT, (board.red_left, board.black_left))] + [(b.rect, b.view_key(mouse_pos)) for b in self.game_buttons]
+
+    def run_menu(self, events):
+        for event in events:
+            if event.type == pygame.QUIT: self.quit()
             for button in self.menu_buttons: button.handle_event(event)
+        if self.game_state != "MENU": return
+        mouse_pos = pygame.mouse.get_pos()
+        self.present(self.draw_menu, ("MENU",), [(b.rect, b.view_key(mouse_pos)) for b in self.menu_buttons])
+
+    def draw_menu(self):
         self.screen.fill(COLOR_BG); self.draw_text("AI Checkers", self.font_title, COLOR_TEXT, (WIDTH//2, HEIGHT//2 - 160))
         for button in self.menu_buttons: button.draw(self.screen, pygame.mouse.get_pos())
-        pygame.display.update()
 
-    def run_game(self):
-        if self.game_mode in ["ai", "training"] and self.turn == BLACK and not self.winner:
+    def run_game(self, events):
+        self.poll_ai()
+        if self.is_ai_turn() and not self.winner:
             self.handle_ai_turn()
 
-        if self.game_mode in ["ai", "2p"] and not self.best_move_hint and not self.winner:
-            if not (self.game_mode == "ai" and self.turn == BLACK):
-                if (pygame.time.get_ticks() - self.turn_start_time) / 1000 >= 10:
+        if self.game_mode in ["ai", "2p"] and not self.best_move_hint and not self.winner and self.ai_job is None:
+            if not (self.game_mode == "ai" and self.turn == BLACK) and not self.chain_undos: # not while a capture chain is half entered
+                if pygame.time.get_ticks() - self.turn_start_time >= HINT_DELAY_MS:
                     self.calculate_hint()
 
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT: pygame.quit(), sys.exit()
+        for event in events:
+            if event.type == pygame.QUIT: self.quit()
             if self.show_instructions:
                 if event.type == pygame.MOUSEBUTTONDOWN: self.show_instructions = False
                 continue
             for button in self.game_buttons: button.handle_event(event)
             if event.type == pygame.MOUSEBUTTONDOWN: self.handle_board_click(pygame.mouse.get_pos())
         
-        winner_check = self.board.winner()
+        winner_check = self.board.winner(self.turn)
         if winner_check and not self.winner: 
             self.winner, self.game_state = winner_check, "GAME_OVER"
             self.sounds.play("win")
+        if self.game_state != "PLAYING": return
+        self.present(self.draw_game_ui, ("PLAYING", self.show_instructions), self.game_regions(pygame.mouse.get_pos()))
         
-        self.draw_game_ui(); pygame.display.update()
-        
-    def run_game_over(self):
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT: pygame.quit(), sys.exit()
+    def run_game_over(self, events):
+        for event in events:
+            if event.type == pygame.QUIT: self.quit()
             if event.type == pygame.MOUSEBUTTONDOWN: self.reset_to_menu()
-        self.draw_game_ui(); overlay = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA); overlay.fill((0,0,0,180))
-        self.screen.blit(overlay, (0,0)); winner_text = "Red Wins!" if self.winner == RED else "Black Wins!"
+        if self.game_state != "GAME_OVER": return
+        self.present(self.draw_game_over, ("GAME_OVER",), self.game_regions(pygame.mouse.get_pos()))
+
+    def draw_game_over(self):
+        self.draw_game_ui(); self.screen.blit(self.render_cache.overlay, (0,0))
+        winner_text = "Red Wins!" if self.winner == RED else "Black Wins!"
         self.draw_text(winner_text, self.font_title, COLOR_TEXT, (WIDTH//2, HEIGHT//2 - 40))
         self.draw_text("Click to return to Menu", self.font_md, COLOR_LABEL, (WIDTH//2, HEIGHT//2 + 40))
-        pygame.display.update()
 
     def handle_board_click(self, pos):
-        if self.winner: return
+        if self.winner or self.is_ai_turn(): return
         if not (BOARD_POS[0] < pos[0] < BOARD_POS[0]+BOARD_SIZE and BOARD_POS[1] < pos[1] < BOARD_POS[1]+BOARD_SIZE): return
         row, col = (pos[1] - BOARD_POS[1])//SQUARE_SIZE, (pos[0] - BOARD_POS[0])//SQUARE_SIZE
         
         if self.selected_piece:
             if (row, col) in self.valid_moves:
                 self.execute_move(self.selected_piece, (row, col))
+            elif self.chain_undos: # A capture chain in progress must be finished
+                return
             elif self.selected_piece == (row, col): # Clicking the same piece deselects it
                 self.selected_piece, self.valid_moves = None, {}
             else: # Clicking another piece, try to select it
                 self.selected_piece, self.valid_moves = None, {}
                 self.handle_board_click(pos)
         else:
-            all_moves = self.board.get_all_valid_moves(self.turn)
-            if (row, col) in all_moves:
-                has_jumps = any(v for moves in all_moves.values() for v in moves.values())
-                piece_can_jump = any(all_moves.get((row, col), {}).values())
-                if has_jumps and not piece_can_jump: return
+            # Only full moves are legal (a capture chain is one move), so a piece without one,
+            # e.g. because another piece must jump, cannot be selected.
+            chains = [mv for mv in self.board.legal_moves(self.turn) if to_rowcol(mv[0]) == (row, col)]
+            if chains:
                 self.sounds.play("select")
-                self.selected_piece, self.valid_moves = (row, col), all_moves.get((row, col), {})
+                self.selected_piece, self.chain_moves = (row, col), chains
+                self.valid_moves = dict.fromkeys(to_rowcol(mv[3][0]) for mv in chains)
 
     def execute_move(self, start_pos, end_pos):
-        self.history.append({'board': self.board.clone(), 'turn': self.turn})
-        is_capture = self.board.move(start_pos, end_pos)
-        self.sounds.play("capture" if is_capture else "move")
-        further_jumps = self.board._get_jumps(end_pos) if is_capture else {}
-        
-        if further_jumps:
+        # The human enters a chain one hop at a time. Hops are shown on the board and then
+        # replaced by the complete move once the chain is unambiguous and finished.
+        hop = len(self.chain_undos)
+        self.chain_moves = [mv for mv in self.chain_moves if to_rowcol(mv[3][hop]) == end_pos]
+        done = next((mv for mv in self.chain_moves if len(mv[3]) == hop + 1), None)
+        self.sounds.play("capture" if self.chain_moves[0][2] else "move")
+        if done:
+            self.complete_move(done)
+        else:
+            self.play_hop(start_pos, end_pos)
             self.selected_piece = end_pos
-            self.valid_moves = further_jumps
+            self.valid_moves = dict.fromkeys(to_rowcol(mv[3][hop + 1]) for mv in self.chain_moves)
             self.turn_start_time = pygame.time.get_ticks()
-        else:
-            self.change_turn()
+
+    def play_hop(self, start_pos, end_pos):
+        self.chain_undos.append(self.board.make_move(hop_move(start_pos, end_pos)))
+
+    def complete_move(self, mv):
+        for undo in reversed(self.chain_undos): self.board.unmake_move(undo)
+        self.chain_undos, self.chain_moves = [], []
+        self.history.append(self.board.make_move(mv)); self.redo_moves, self.notice = [], None
+        self.change_turn()
             
+    def is_ai_turn(self): return self.game_mode in ["ai", "training"] and self.turn == BLACK
+
+    # --- Background Search ---
+    # Searches run in the AIWorker process; the main loop keeps rendering and polls for results.
+    # Positions in the opening book, or already analysed at this difficulty (hints after an undo,
+    # a replayed AI move), are answered at once, without a search. A hint may also come from a
+    # deeper search; an AI move only from one at its own difficulty, so the book, searched deeper
+    # than the easier levels look, only plays for a level allowed that depth.
+    def start_search(self, job, maximizing_player):
+        color = BLACK if maximizing_player else RED
+        _, depth, time_ms = DIFFICULTY_LEVELS[self.difficulty]
+        book_move = self.book and (job != "move" or self.book.depth <= depth) and self.book.lookup(self.board, color)
+        if book_move: return self.accept_result(job, (None, book_move))
+        key = self.board.key(color)
+        legal = {move_to_path(mv) for mv in self.board.legal_moves(color)}
+        cached = self.analysis.get(key, depth, exact=job == "move", legal=legal)
+        if cached: return self.accept_result(job, cached[:2])
+        self.ai.submit(self.board, maximizing_player, depth, time_ms, self.game_id)
+        self.ai_job, self.ai_key, self.ai_depth = job, key, depth
+
+    def cancel_ai(self):
+        self.ai.cancel(); self.ai_job = None
+        self.ai_result = self.ai_chain = None
+
+    def poll_ai(self):
+        result = self.ai.poll()
+        if result is None: return
+        job, self.ai_job = self.ai_job, None
+        if self.ai.last_stats: print(f"{job}: {self.ai.last_stats.summary()}")
+        if result[1]: self.analysis.put(self.ai_key, *result, self.ai.last_depth, self.ai_depth)
+        self.accept_result(job, result)
+
+    def accept_result(self, job, result):
+        if job == "hint": self.best_move_hint = result[1]
+        elif job == "move": self.ai_result = result
+
     def handle_ai_turn(self):
-        pygame.time.wait(300)
-        _, best_move = self.board.minimax(self.board, self.difficulty, -inf, inf, True)
-        if best_move:
-            self.history.append({'board': self.board.clone(), 'turn': self.turn})
-            start_pos, end_pos = best_move
-            is_capture = self.board.move(start_pos, end_pos)
-            self.sounds.play("capture" if is_capture else "move")
-            
-            further_jumps = self.board._get_jumps(end_pos) if is_capture else {}
-            while further_jumps:
-                self.draw_game_ui(); pygame.display.update(); pygame.time.wait(500)
-                next_jump_pos = list(further_jumps.keys())[0]
-                self.board.move(end_pos, next_jump_pos)
-                self.sounds.play("capture")
-                end_pos = next_jump_pos
-                further_jumps = self.board._get_jumps(end_pos)
-        self.change_turn()
+        now = pygame.time.get_ticks()
+        if self.ai_chain:
+            if now >= self.ai_next_step: self.continue_ai_jump()
+            return
+        if self.ai_result is None:
+            if self.ai_job != "move": self.start_search("move", True)
+            return
+        if now - self.turn_start_time < AI_MOVE_DELAY_MS: return
+
+        (_, best_move), self.ai_result = self.ai_result, None
+        if not best_move: return self.change_turn()
+        mv = next(mv for mv in self.board.legal_moves(self.turn) if move_to_path(mv) == best_move)
+        self.sounds.play("capture" if mv[2] else "move")
+        if len(best_move) == 2: return self.complete_move(mv)
+        self.play_hop(best_move[0], best_move[1])
+        self.ai_chain, self.ai_next_step = (mv, best_move, 1), now + AI_JUMP_DELAY_MS
+
+    def continue_ai_jump(self):
+        mv, path, hop = self.ai_chain
+        self.sounds.play("capture")
+        if hop + 2 == len(path):
+            self.ai_chain = None
+            self.complete_move(mv)
+        else:
+            self.play_hop(path[hop], path[hop + 1])
+            self.ai_chain, self.ai_next_step = (mv, path, hop + 1), pygame.time.get_ticks() + AI_JUMP_DELAY_MS
 
     def change_turn(self):
-        self.selected_piece, self.valid_moves = None, {}
+        self.cancel_ai(); self.selected_piece, self.valid_moves = None, {}
         self.turn = BLACK if self.turn == RED else RED
         self.best_move_hint = None
         self.turn_start_time = pygame.time.get_ticks()
@@ -350,101 +446,131 @@ class Game:
             self.calculate_hint()
 
     def calculate_hint(self):
-        is_maximizing = self.turn == BLACK
-        _, best_move = self.board.minimax(self.board, self.difficulty, -inf, inf, is_maximizing)
-        self.best_move_hint = best_move
+        self.start_search("hint", self.turn == BLACK)
 
     def toggle_difficulty(self):
-        self.difficulty = 2 if self.difficulty == 6 else self.difficulty + 2
+        self.difficulty = (self.difficulty + 1) % len(DIFFICULTY_LEVELS)
         self.init_menu_buttons()
 
+    # --- History ---
+    # history holds the engine's undo record of every completed move, so stepping back is an
+    # unmake instead of a stored board copy. Against the AI, Undo and Redo also step over the
+    # AI's reply, back to the player's turn.
     def undo_move(self):
-        if not self.history: return
-        last_state = self.history.pop()
-        self.board, self.turn = last_state['board'], last_state['turn']
+        self.cancel_ai()
+        if self.chain_undos: # Hops of a capture chain still on the board come off first
+            for undo in reversed(self.chain_undos): self.board.unmake_move(undo)
+            self.chain_undos = []
+            if not self.is_ai_turn(): return self.resume_play() # a player's half-entered chain is all Undo takes back
+        elif not self.history: return
+        if self.history:
+            self.step_back()
+            while self.history and self.is_ai_turn(): self.step_back()
+        self.resume_play()
+
+    def redo_move(self):
+        if not self.redo_moves or self.chain_undos: return
+        self.cancel_ai()
+        self.step_forward()
+        while self.redo_moves and self.is_ai_turn(): self.step_forward()
+        self.resume_play()
+
+    def step_back(self):
+        undo = self.history.pop(); self.board.unmake_move(undo); self.redo_moves.append(undo[0])
+        self.turn = BLACK if self.turn == RED else RED
+
+    def step_forward(self):
+        self.history.append(self.board.make_move(self.redo_moves.pop()))
+        self.turn = BLACK if self.turn == RED else RED
+
+    def resume_play(self):
+        self.chain_moves, self.chain_undos = [], []
         self.winner, self.selected_piece, self.valid_moves, self.best_move_hint = None, None, {}, None
         self.turn_start_time = pygame.time.get_ticks()
         if self.game_mode == 'training' and self.turn == RED: self.calculate_hint()
 
+    # --- Game Records ---
+    def save_game(self):
+        names = ("Player 1", "Player 2") if self.game_mode == '2p' else ("AI", "Player")
+        text = game_to_pdn([move_to_pdn(undo[0]) for undo in self.history], RESULTS[self.winner],
+                           {"Black": names[0], "White": names[1], "Date": time.strftime("%Y.%m.%d")}, self.start_fen)
+        try:
+            with open(SAVE_PATH, "w", encoding="utf-8") as f: f.write(text)
+            self.notice = f"Saved {len(self.history)} moves to {SAVE_PATH}"
+        except OSError: self.notice = f"Could not write {SAVE_PATH}"
+
+    def load_game(self):
+        # Loads the first game of SAVE_PATH; its moves become the undo history.
+        try:
+            with open(SAVE_PATH, encoding="utf-8") as f: game = parse_pdn(f.read())[0]
+            board, turn, undos = replay(game)
+        except (OSError, IndexError, ValueError): self.notice = f"Could not load {SAVE_PATH}"; return
+        self.reset()
+        self.board, self.turn, self.history, self.start_fen = board, turn, undos, game["tags"].get("FEN")
+        self.notice = f"Loaded {len(undos)} moves"
+        self.resume_play()
+
     def draw_game_ui(self):
         self.screen.fill(COLOR_BG); self.draw_board_and_pieces(); self.draw_sidebar()
         self.draw_captured_pieces();
         if self.show_instructions: self.draw_instructions()
 
     def draw_board_and_pieces(self):
-        pygame.draw.rect(self.screen,(30,20,10),(BOARD_POS[0]-10,BOARD_POS[1]-10,BOARD_SIZE+20,BOARD_SIZE+20),border_radius=12)
-        for r in range(ROWS):
-            for c in range(COLS):
-                color = COLOR_LIGHT_SQUARE if (r+c)%2==0 else COLOR_DARK_SQUARE
-                pygame.draw.rect(self.screen,color,(BOARD_POS[0]+c*SQUARE_SIZE,BOARD_POS[1]+r*SQUARE_SIZE,SQUARE_SIZE,SQUARE_SIZE))
+        cache = self.render_cache
+        self.screen.blit(cache.board, BOARD_RECT)
         
-        if self.best_move_hint and not self.selected_piece:
-            show_hint = (self.game_mode == 'training' and self.turn == RED) or \
-                        (self.game_mode in ['ai', '2p'] and ((pygame.time.get_ticks() - self.turn_start_time) / 1000 >= 10))
-            if show_hint and self.best_move_hint:
-                start_pos, end_pos = self.best_move_hint
-                for r, c in [start_pos, end_pos]:
-                    s = pygame.Surface((SQUARE_SIZE, SQUARE_SIZE), pygame.SRCALPHA); s.fill(COLOR_HINT_GLOW)
-                    self.screen.blit(s, (BOARD_POS[0] + c*SQUARE_SIZE, BOARD_POS[1] + r*SQUARE_SIZE))
+        for r, c in self.visible_hint() or ():
+            self.screen.blit(cache.hint_glow, (BOARD_POS[0] + c*SQUARE_SIZE, BOARD_POS[1] + r*SQUARE_SIZE))
 
         if self.selected_piece:
             r, c = self.selected_piece
-            s = pygame.Surface((SQUARE_SIZE, SQUARE_SIZE), pygame.SRCALPHA); s.fill(COLOR_SELECTED_GLOW)
-            self.screen.blit(s, (BOARD_POS[0] + c*SQUARE_SIZE, BOARD_POS[1] + r*SQUARE_SIZE))
+            self.screen.blit(cache.selected_glow, (BOARD_POS[0] + c*SQUARE_SIZE, BOARD_POS[1] + r*SQUARE_SIZE))
 
         for r, c in self.valid_moves:
-            s = pygame.Surface((SQUARE_SIZE, SQUARE_SIZE), pygame.SRCALPHA)
-            pygame.draw.circle(s, COLOR_VALID_MOVE, (SQUARE_SIZE//2, SQUARE_SIZE//2), 15)
-            self.screen.blit(s, (BOARD_POS[0] + c*SQUARE_SIZE, BOARD_POS[1] + r*SQUARE_SIZE))
+            self.screen.blit(cache.move_marker, (BOARD_POS[0] + c*SQUARE_SIZE, BOARD_POS[1] + r*SQUARE_SIZE))
 
         for r in range(ROWS):
             for c in range(COLS):
                 p_val = self.board.get_piece(r, c)
                 if p_val != EMPTY:
-                    color = COLOR_RED_PIECE if p_val in (RED, KING_R) else COLOR_BLACK_PIECE
-                    radius = SQUARE_SIZE//2 - 12
-                    center_x, center_y = BOARD_POS[0]+c*SQUARE_SIZE+SQUARE_SIZE//2, BOARD_POS[1]+r*SQUARE_SIZE+SQUARE_SIZE//2
-                    pygame.draw.circle(self.screen, (0,0,0,50), (center_x, center_y+4), radius)
-                    pygame.draw.circle(self.screen, color, (center_x, center_y), radius)
-                    if p_val in (KING_R, KING_B):
-                        crown_font = pygame.font.SysFont("arial", 30, bold=True)
-                        crown = crown_font.render('👑', True, COLOR_KING)
-                        self.screen.blit(crown, (center_x-crown.get_width()//2, center_y-crown.get_height()//2))
+                    self.screen.blit(cache.pieces[p_val], (BOARD_POS[0] + c*SQUARE_SIZE, BOARD_POS[1] + r*SQUARE_SIZE))
+
+    def visible_hint(self):
+        if not self.best_move_hint or self.selected_piece: return None
+        if (self.game_mode == 'training' and self.turn == RED) or \
+           (self.game_mode in ['ai', '2p'] and pygame.time.get_ticks() - self.turn_start_time >= HINT_DELAY_MS):
+            return self.best_move_hint
+        return None
 
     def draw_sidebar(self):
-        sidebar_x = BOARD_POS[0] + BOARD_SIZE + PADDING
-        card1_rect = pygame.Rect(sidebar_x, BOARD_POS[1], SIDEBAR_WIDTH, 220)
-        pygame.draw.rect(self.screen, COLOR_CARD, card1_rect, border_radius=16)
-        self.draw_text("AI Checkers", self.font_lg, COLOR_TEXT, (card1_rect.centerx, card1_rect.y + 45))
-        self.draw_text("A game of strategy", self.font_sm, COLOR_LABEL, (card1_rect.centerx, card1_rect.y + 80))
+        self.screen.blit(self.render_cache.sidebar, (SIDEBAR_X, BOARD_POS[1]))
         
         status_text, status_color = self.get_status_info()
-        status_rect = pygame.Rect(card1_rect.x+20, card1_rect.y+110, card1_rect.width-40, 40)
-        pygame.draw.rect(self.screen, status_color, status_rect, border_radius=10)
-        self.draw_text(status_text, self.font_md, COLOR_TEXT, status_rect)
+        pygame.draw.rect(self.screen, status_color, STATUS_RECT, border_radius=10)
+        self.draw_text(status_text, self.font_md, COLOR_TEXT, STATUS_RECT)
 
-        card2_rect = pygame.Rect(sidebar_x, card1_rect.bottom + 20, SIDEBAR_WIDTH, 350)
-        pygame.draw.rect(self.screen, COLOR_CARD, card2_rect, border_radius=16)
+        if self.ai_job == "hint": self.draw_text("Calculating hint...", self.font_sm, COLOR_LABEL, HINT_LABEL_RECT.center)
+        if self.notice: self.draw_text(self.notice, self.font_sm, COLOR_LABEL, NOTICE_RECT.center)
         
         for button in self.game_buttons: button.draw(self.screen, pygame.mouse.get_pos())
     
     def get_status_info(self):
         if self.winner: return ("Red Wins!", COLOR_RED_PIECE) if self.winner == RED else ("Black Wins!", COLOR_BLACK_PIECE)
+        if self.ai_job == "move": return ("AI thinking" + "." * (pygame.time.get_ticks() // 400 % 4), COLOR_BLACK_PIECE)
         p1_name = "Player 1 (Black)" if self.game_mode == '2p' else "AI (Black)"
         p2_name = "Player 2 (Red)" if self.game_mode == '2p' else "Your Turn (Red)"
         if self.game_mode == 'training': p1_name = "AI (Black)"
         return (p1_name, COLOR_BLACK_PIECE) if self.turn == BLACK else (p2_name, COLOR_RED_PIECE)
 
     def draw_captured_pieces(self):
-        y_pos = BOARD_POS[1] + BOARD_SIZE + 20
+        y_pos = CAPTURED_RECT.y
         red_captured = 12 - self.board.black_left
         black_captured = 12 - self.board.red_left
         self.draw_text(f"Red Captured: {red_captured}", self.font_sm, COLOR_LABEL, (BOARD_POS[0], y_pos), "left")
         self.draw_text(f"Black Captured: {black_captured}", self.font_sm, COLOR_LABEL, (BOARD_POS[0] + BOARD_SIZE, y_pos), "right")
 
     def draw_instructions(self):
-        overlay = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA); overlay.fill((0,0,0,180))
-        self.screen.blit(overlay, (0,0))
+        self.screen.blit(self.render_cache.overlay, (0,0))
         card_rect = pygame.Rect(0, 0, 500, 300); card_rect.center = (WIDTH//2, HEIGHT//2)
         pygame.draw.rect(self.screen, COLOR_CARD, card_rect, border_radius=16)
         self.draw_text("How to Play", self.font_lg, COLOR_TEXT, (card_rect.centerx, card_rect.y + 40))
@@ -453,7 +579,7 @@ class Game:
         self.draw_text("Click anywhere to close", self.font_sm, COLOR_TEXT, (card_rect.centerx, card_rect.bottom - 30))
 
     def draw_text(self, text, font, color, container, align="center"):
-        text_surf = font.render(text, True, color)
+        text_surf = self.render_cache.text(text, font, color)
         text_rect = text_surf.get_rect()
         if isinstance(container, pygame.Rect):
             if align == "center": text_rect.center = container.center
@@ -465,10 +591,14 @@ class Game:
         self.screen.blit(text_surf, text_rect)
 
 def main():
+    parser = argparse.ArgumentParser(description="AI Checkers")
+    parser.add_argument("--stats", action="store_true", help="print search stats per AI move and frame-time percentiles")
+    parser.add_argument("--analysis-cache", default=DEFAULT_CACHE_PATH, help='file keeping analysed positions between sessions, "" to keep them in memory only')
+    args = parser.parse_args()
     pygame.init()
     screen = pygame.display.set_mode((WIDTH, HEIGHT))
     pygame.display.set_caption("AI Checkers Pro")
-    Game(screen).run()
+    Game(screen, args.stats, args.analysis_cache).run()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,152 @@
+import argparse
+import gzip
+import json
+import multiprocessing as mp
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from math import inf
+from checkers_engine import Board, RED, BLACK, move_to_path
+from checkers_search import Searcher
+
+# --- Notation ---
+# PDN for English draughts (GameType 21). Squares are numbered 1-32 from Black's side, Black
+# moves first and plays as player one, so "1-0" is a Black win and "0-1" a Red (White) win.
+RESULTS = {BLACK: "1-0", RED: "0-1", None: "*"}
+DRAW_RESULT = "1/2-1/2"
+START_FEN = Board().to_fen(BLACK)
+LINE_WIDTH = 79
+TOKENS = re.compile(r'\[(\w+)\s+"([^"]*)"\]'      # tag pair
+                    r'|\{[^}]*\}|;[^\n]*'         # comments
+                    r'|(\()|(\))'                 # variations
+                    r'|(1-0|0-1|1/2-1/2|2-0|0-2|1-1|\*)(?![-x\d])'
+                    r'|(\d+(?:[-x]\d+)+)'         # move
+                    r'|\d+\.(?:\.\.)?|\$\d+|\S')  # move numbers, NAGs, anything else
+
+# --- Writing ---
+def game_to_pdn(moves, result="*", tags=None, fen=None):
+    # moves are PDN move strings, played from the start position or from fen.
+    header = {"Event": "AI Checkers", "Black": "?", "White": "?", **(tags or {}), "Result": result, "GameType": "21"}
+    if fen and fen != START_FEN: header["SetUp"], header["FEN"] = "1", fen
+    black_first = not fen or fen[0] in "Bb"
+    tokens = []
+    for ply, move in enumerate(moves, 0 if black_first else 1):
+        # A move number stays on the same line as its move.
+        tokens.append(f"{ply // 2 + 1}. {move}" if ply % 2 == 0 else move if tokens else f"1... {move}")
+    tokens.append(result)
+    lines, line = [f'[{key} "{value}"]' for key, value in header.items()] + [""], ""
+    for token in tokens:
+        if line and len(line) + 1 + len(token) > LINE_WIDTH: lines.append(line); line = token
+        else: line = f"{line} {token}" if line else token
+    return "\n".join(lines + [line, ""])
+
+# --- Reading ---
+def parse_pdn(text):
+    # A list of games, each {"tags": {...}, "moves": [...], "result": ...}. Comments and
+    # variations are skipped; a result token or a new tag section ends a game.
+    games, game, nesting = [], None, 0
+    for m in TOKENS.finditer(text):
+        tag, value, opened, closed, result, move = m.groups()
+        if opened: nesting += 1
+        elif closed: nesting = max(0, nesting - 1)
+        elif nesting: continue
+        elif tag:
+            if game is None or game["moves"]:
+                game = {"tags": {}, "moves": [], "result": "*"}; games.append(game)
+            game["tags"][tag] = value
+        elif move or result:
+            if game is None:
+                game = {"tags": {}, "moves": [], "result": "*"}; games.append(game)
+            if move: game["moves"].append(move)
+            else: game["result"] = result; game = None
+    return games
+
+def find_move(board, turn, text):
+    # Matches "11-15", "22x15x6" or the short "22x6": origin, destination and any landing
+    # squares given in between must agree with exactly one legal move.
+    squares = [int(sq) - 1 for sq in re.split("[-x]", text)]
+    found = []
+    for mv in board.legal_moves(turn):
+        if mv[0] != squares[0] or mv[3][-1] != squares[-1] or bool(mv[2]) != ("x" in text): continue
+        landings = iter(mv[3])
+        if all(sq in landings for sq in squares[1:-1]): found.append(mv)
+    return found[0] if len(found) == 1 else None
+
+def start_position(tags):
+    return Board.from_fen(tags["FEN"]) if "FEN" in tags else (Board(), BLACK)
+
+def replay(game):
+    # Plays a parsed game through the engine: the final board, the side to move and the undo
+    # record of every move. Raises ValueError at the first illegal or ambiguous move.
+    board, turn = start_position(game["tags"])
+    undos = []
+    for ply, text in enumerate(game["moves"], 1):
+        mv = find_move(board, turn, text)
+        if mv is None: raise ValueError(f"ply {ply}: {text} is not a legal move")
+        undos.append(board.make_move(mv)); turn = RED if turn == BLACK else BLACK
+    return board, turn, undos
+
+# --- Analysis ---
+def analyse_game(index, game, depth):
+    # Searches every position of the game. A move's drop is how far the score fell for the
+    # side that played it, from the position before to the position after.
+    board, turn = start_position(game["tags"])
+    searcher, scores, agree, played = Searcher(), [], 0, []
+    for text in game["moves"]:
+        mv = find_move(board, turn, text)
+        if mv is None: return {"game": index, "error": f"ply {len(played) + 1}: {text} is not a legal move"}
+        score, path = searcher.minimax(board, depth, -inf, inf, turn == BLACK)
+        scores.append(score); played.append((text, turn)); agree += path == move_to_path(mv)
+        board.make_move(mv); turn = RED if turn == BLACK else BLACK
+    scores.append(searcher.minimax(board, depth, -inf, inf, turn == BLACK)[0])
+    worst = (0, None)
+    for ply, (text, mover) in enumerate(played):
+        drop = scores[ply] - scores[ply + 1] if mover == BLACK else scores[ply + 1] - scores[ply]
+        if drop > worst[0]: worst = (drop, f"{ply // 2 + 1}{'.' if mover == BLACK else '...'} {text}")
+    return {"game": index, "result": game["result"], "plies": len(played), "agree": agree,
+            "worst_drop": round(worst[0], 2), "worst_move": worst[1]}
+
+def bulk_replay(games, depth, workers):
+    # Without a depth the games are only replayed, checking every move for legality.
+    start = time.perf_counter()
+    if not depth:
+        plies = errors = 0
+        for index, game in enumerate(games):
+            try: plies += len(replay(game)[2])
+            except ValueError as e: errors += 1; print(f"game {index}: {e}", file=sys.stderr)
+        elapsed = time.perf_counter() - start
+        print(f"replayed {len(games)} games, {plies} plies, {errors} errors in {elapsed:.2f}s ({plies / max(elapsed, 1e-9):.0f} plies/s)")
+        return
+    with ProcessPoolExecutor(workers, mp_context=mp.get_context("spawn")) as pool:
+        futures = [pool.submit(analyse_game, index, game, depth) for index, game in enumerate(games)]
+        for future in futures: print(json.dumps(future.result()), flush=True)
+    print(f"analysed {len(games)} games at depth {depth} in {time.perf_counter() - start:.1f}s", file=sys.stderr)
+
+def selfplay_to_pdn(records):
+    # Converts the JSON lines written by checkers_selfplay into PDN games.
+    for record in records:
+        result = {"black": RESULTS[BLACK], "red": RESULTS[RED], "draw": DRAW_RESULT}[record["result"]]
+        tags = {"Event": "Self-play", "Round": record["game"] + 1, "Black": record["black"], "White": record["red"]}
+        yield game_to_pdn(record["moves"].split(), result, tags)
+
+def main():
+    parser = argparse.ArgumentParser(description="Checkers PDN import, export and bulk analysis")
+    sub = parser.add_subparsers(dest="command", required=True)
+    rep = sub.add_parser("replay", help="replay every game of a PDN file through the engine")
+    rep.add_argument("pdn")
+    rep.add_argument("--analyse", type=int, metavar="DEPTH", help="search each position and report engine agreement and the worst move")
+    rep.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    conv = sub.add_parser("from-selfplay", help="convert self-play results (JSON lines) to PDN on stdout")
+    conv.add_argument("results")
+    args = parser.parse_args()
+    if args.command == "replay":
+        with open(args.pdn, encoding="utf-8") as f: games = parse_pdn(f.read())
+        bulk_replay(games, args.analyse, args.workers)
+    elif args.command == "from-selfplay":
+        with (gzip.open if args.results.endswith(".gz") else open)(args.results, "rt") as f:
+            for text in selfplay_to_pdn(json.loads(line) for line in f if line.strip()): print(text)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,361 @@
+import multiprocessing as mp
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from math import inf
+from checkers_engine import RED, BLACK, move_to_path
+from checkers_eval import DEFAULT_EVALUATOR, Evaluator
+from checkers_tablebase import open_tablebase
+
+# --- Transposition Table ---
+EXACT, LOWER, UPPER = 0, 1, 2
+DEFAULT_TT_MB = 32
+TT_ENTRY_BYTES = 200  # rough CPython footprint of one slot: the entry tuple plus its ints
+
+class TranspositionTable:
+    def __init__(self, max_mb=DEFAULT_TT_MB):
+        entries = max(1, int(max_mb * 1024 * 1024) // TT_ENTRY_BYTES)
+        self.size = 1 << (entries.bit_length() - 1)
+        self.mask = self.size - 1
+        self.table = [None] * self.size
+        self.generation = 0
+
+    def clear(self):
+        self.table = [None] * self.size
+        self.generation = 0
+
+    def new_search(self): self.generation += 1
+
+    def probe(self, key):
+        entry = self.table[key & self.mask]
+        return entry if entry is not None and entry[0] == key else None
+
+    def store(self, key, depth, flag, score, move):
+        # Depth-preferred replacement, but entries left over from an earlier search always yield.
+        i = key & self.mask; old = self.table[i]
+        if old is None or old[5] != self.generation or depth >= old[1]:
+            self.table[i] = (key, depth, flag, score, move, self.generation)
+
+# --- Search ---
+# Difficulty levels: (label, max search depth, time budget in ms)
+DIFFICULTY_LEVELS = [("Easy", 2, 250), ("Medium", 4, 1000), ("Hard", 8, 2500)]
+TIME_CHECK_NODES = 1024
+TIE_EPS = 1e-6
+MAX_PLY = 64
+WIN_SCORE = 1000
+TB_WIN_SCORE = WIN_SCORE // 2
+# Move ordering tiers; quiet moves below KILLER_SCORE are ranked by their history score.
+TT_MOVE_SCORE, PV_MOVE_SCORE, CAPTURE_SCORE, KILLER_SCORE = 1 << 40, 1 << 39, 1 << 32, 1 << 31
+
+def _root_key(score, idx, alpha, beta, maximizing_player):
+    # Scores are clamped to the root window and ties go to the earliest generated move,
+    # so every root search (serial, iterative or parallel) agrees on the best move.
+    score = min(max(score, alpha), beta)
+    return (score if maximizing_player else -score, -idx)
+
+def _move_path(mv): return mv and move_to_path(mv)
+
+def _terminal_score(maximizing_player, depth):
+    # The side to move has no legal move and has lost. Adding the remaining depth ranks a win
+    # found nearer the root (a faster one) higher while keeping scores position based.
+    return -(WIN_SCORE + depth) if maximizing_player else WIN_SCORE + depth
+
+def _tablebase_score(value, maximizing_player):
+    # A tablebase value is +n/-n for a win/loss of the side to move in n-1 plies. Decided
+    # positions score between material and the search's own wins, a faster win higher.
+    if not value: return 0
+    score = TB_WIN_SCORE - value if value > 0 else -TB_WIN_SCORE - value
+    return score if maximizing_player else -score
+
+class SearchTimeout(Exception):
+    pass
+
+# --- Search Statistics ---
+# Optional counters: give a Searcher a SearchStats and every search refills it. Left at None
+# the search pays one attribute test per node.
+class SearchStats:
+    def __init__(self): self.reset()
+
+    def reset(self):
+        self.interior = self.moves = self.qnodes = 0
+        self.cutoffs = self.first_cutoffs = self.tt_hits = self.tt_cutoffs = self.tb_hits = 0
+        self.iterations = []  # (depth, nodes so far, seconds so far) for every completed depth
+
+    @property
+    def depth(self): return self.iterations[-1][0] if self.iterations else 0
+    @property
+    def nodes(self): return self.iterations[-1][1] if self.iterations else 0
+    @property
+    def seconds(self): return self.iterations[-1][2] if self.iterations else 0.0
+
+    def cutoff_ratio(self): return self.cutoffs / self.interior if self.interior else 0.0
+    def first_cutoff_ratio(self): return self.first_cutoffs / self.cutoffs if self.cutoffs else 0.0
+
+    def branching_factor(self):
+        # Effective branching factor: growth of the node count from one depth to the next.
+        if len(self.iterations) < 2: return 0.0
+        (_, n0, _), (_, n1, _), (_, n2, _) = ([(0, 0, 0)] + self.iterations)[-3:]
+        return (n2 - n1) / (n1 - n0) if n1 > n0 else 0.0
+
+    def summary(self):
+        nps = self.nodes / self.seconds if self.seconds else 0.0
+        return (f"depth {self.depth}  nodes {self.nodes}  {nps / 1000:.1f} kn/s  {self.seconds * 1000:.0f} ms  "
+                f"cutoffs {self.cutoff_ratio():.0%} (first move {self.first_cutoff_ratio():.0%})  "
+                f"ebf {self.branching_factor():.2f}  tt hits {self.tt_hits}  tb hits {self.tb_hits}")
+
+class Searcher:
+    def __init__(self, tt_mb=DEFAULT_TT_MB, tablebase=None, evaluator=None):
+        self.tt = TranspositionTable(tt_mb)
+        self.tablebase = tablebase  # optional endgame Tablebase, probed once few pieces are left
+        self.evaluate = (evaluator or DEFAULT_EVALUATOR).evaluate
+        self.pv, self.follow_pv = [], False
+        self.deadline, self.nodes, self.completed_depth = inf, 0, 0
+        self.killers = [[None, None] for _ in range(MAX_PLY)]
+        self.history = {RED: [0] * 1024, BLACK: [0] * 1024}
+        self.should_stop = None  # optional callable polled with the clock, e.g. to cancel from another process
+        self.stats = None  # optional SearchStats
+
+    def new_game(self):
+        self.tt.clear()
+        self.history = {RED: [0] * 1024, BLACK: [0] * 1024}
+
+    def _new_search(self):
+        # Killers are position specific, history is only a trend: reset one, decay the other.
+        self.tt.new_search(); self.nodes = 0
+        if self.stats: self.stats.reset()
+        self.killers = [[None, None] for _ in range(MAX_PLY)]
+        for table in self.history.values():
+            for i, v in enumerate(table):
+                if v: table[i] = v >> 1
+
+    def minimax(self, board, depth, alpha, beta, maximizing_player):
+        self._new_search(); self.pv, self.follow_pv, self.deadline = [], False, inf
+        start = time.perf_counter()
+        score, best_move = self._search_root(board, depth, alpha, beta, maximizing_player)
+        if self.stats: self.stats.iterations.append((depth, self.nodes, time.perf_counter() - start))
+        return score, _move_path(best_move)
+
+    def search(self, board, maximizing_player, max_depth, time_ms):
+        # Iterative deepening: each finished depth replaces the answer, and an iteration that
+        # runs past the budget is thrown away. Depth 1 always completes so there is a move.
+        board = board.clone()
+        start = time.perf_counter()
+        self._new_search(); self.pv, self.completed_depth = [], 0
+        result = (self.evaluate(board), None)
+        for depth in range(1, max_depth + 1):
+            self.deadline = inf if depth == 1 else start + time_ms / 1000
+            self.follow_pv = True
+            try: score, best_move = self._search_root(board, depth, -inf, inf, maximizing_player)
+            except SearchTimeout: break
+            if best_move is None: break
+            result, self.completed_depth = (score, best_move), depth
+            self.pv = self._extract_pv(board, maximizing_player, depth)
+            if self.stats: self.stats.iterations.append((depth, self.nodes, time.perf_counter() - start))
+            if time.perf_counter() >= start + time_ms / 1000: break
+        self.deadline = inf
+        score, best_move = result
+        return score, _move_path(best_move)
+
+    def _search_root(self, board, depth, alpha, beta, maximizing_player):
+        color = BLACK if maximizing_player else RED
+        if depth == 0: return self.evaluate(board), None
+        moves = board.generate_moves(color)
+        if not moves: return _terminal_score(maximizing_player, depth), None
+        entry = self.tt.probe(board.key(color))
+        pv_move = self.pv[0] if self.follow_pv and self.pv else None
+        if pv_move not in moves: self.follow_pv = False
+        scores = self._score_moves(board, moves, 0, color, entry and entry[4], pv_move)
+        order = sorted(range(len(moves)), key=scores.__getitem__, reverse=True)
+
+        best, best_idx, best_key = None, None, None
+        for idx in order:
+            # Once a best score exists, search just below it (above it when minimizing) so an
+            # equal score comes back exact and the tie-break by move order stays well defined.
+            lo, hi = alpha, beta
+            if best is not None:
+                if maximizing_player: lo = max(alpha, best - TIE_EPS)
+                else: hi = min(beta, best + TIE_EPS)
+            undo = board.make_move(moves[idx])
+            score = self._minimax(board, depth-1, lo, hi, not maximizing_player, 1)[0]; self.follow_pv = False
+            board.unmake_move(undo)
+            key = _root_key(score, idx, alpha, beta, maximizing_player)
+            if best_key is None or key > best_key: best, best_idx, best_key = score, idx, key
+            if (best >= beta) if maximizing_player else (best <= alpha): break
+
+        flag = UPPER if best <= alpha else LOWER if best >= beta else EXACT
+        self.tt.store(board.key(color), depth, flag, best, moves[best_idx])
+        return best, moves[best_idx]
+
+    def _extract_pv(self, board, maximizing_player, depth):
+        pv, undos = [], []
+        for _ in range(depth):
+            color = BLACK if maximizing_player else RED
+            entry = self.tt.probe(board.key(color))
+            if entry is None or entry[4] not in board.generate_moves(color): break
+            pv.append(entry[4]); undos.append(board.make_move(entry[4]))
+            maximizing_player = not maximizing_player
+        for undo in reversed(undos): board.unmake_move(undo)
+        return pv
+
+    def _minimax(self, board, depth, alpha, beta, maximizing_player, ply):
+        self.nodes += 1
+        if self.nodes % TIME_CHECK_NODES == 0:
+            if time.perf_counter() >= self.deadline or (self.should_stop and self.should_stop()): raise SearchTimeout
+        color, stats = BLACK if maximizing_player else RED, self.stats
+        if self.tablebase:
+            score = self._probe_tablebase(board, color, maximizing_player)
+            if score is not None: return score, None
+        key = board.key(color)
+        entry = self.tt.probe(key); tt_move = None
+        if entry is not None:
+            _, e_depth, flag, score, tt_move, _ = entry
+            if stats: stats.tt_hits += 1
+            # Only same-depth entries cut off: a fixed-depth score then depends on the position
+            # alone, not on the order the tree was walked, which the parallel search relies on.
+            if e_depth == depth:
+                if flag == LOWER: alpha = max(alpha, score)
+                elif flag == UPPER: beta = min(beta, score)
+                if flag == EXACT or beta <= alpha:
+                    if stats: stats.tt_cutoffs += 1
+                    return score, tt_move
+
+        if depth == 0: return self._quiesce(board, alpha, beta, maximizing_player, ply), None
+        moves = board.generate_moves(color)
+        if not moves: return _terminal_score(maximizing_player, depth), None
+        if stats: stats.interior += 1; stats.moves += len(moves)
+        pv_move = None
+        if self.follow_pv:
+            pv_move = self.pv[ply] if ply < len(self.pv) else None
+            if pv_move not in moves: self.follow_pv = False
+        scores = self._score_moves(board, moves, ply, color, tt_move, pv_move)
+        if any(scores): moves = [mv for _, mv in sorted(zip(scores, moves), reverse=True)]
+        alpha_orig, beta_orig = alpha, beta
+        best_move = None
+        if maximizing_player:
+            best = -inf
+            for mv in moves:
+                undo = board.make_move(mv)
+                evaluation = self._minimax(board, depth-1, alpha, beta, False, ply+1)[0]; self.follow_pv = False
+                board.unmake_move(undo)
+                if evaluation > best: best, best_move = evaluation, mv
+                alpha = max(alpha, evaluation)
+                if beta <= alpha: self._record_cutoff(mv, depth, ply, color, mv is moves[0]); break
+        else:
+            best = inf
+            for mv in moves:
+                undo = board.make_move(mv)
+                evaluation = self._minimax(board, depth-1, alpha, beta, True, ply+1)[0]; self.follow_pv = False
+                board.unmake_move(undo)
+                if evaluation < best: best, best_move = evaluation, mv
+                beta = min(beta, evaluation)
+                if beta <= alpha: self._record_cutoff(mv, depth, ply, color, mv is moves[0]); break
+
+        flag = UPPER if best <= alpha_orig else LOWER if best >= beta_orig else EXACT
+        self.tt.store(key, depth, flag, best, best_move)
+        return best, best_move
+
+    def _quiesce(self, board, alpha, beta, maximizing_player, ply):
+        # Past the horizon only forced jumps are followed, so a capture sequence is never
+        # cut off half way. Jumps are compulsory, so there is no stand-pat option.
+        color = BLACK if maximizing_player else RED
+        if self.stats: self.stats.qnodes += 1
+        if self.tablebase:
+            score = self._probe_tablebase(board, color, maximizing_player)
+            if score is not None: return score
+        moves = board.generate_moves(color)
+        if not moves: return _terminal_score(maximizing_player, 0)
+        if not moves[0][2]: return self.evaluate(board)
+        moves.sort(key=lambda mv: 2 * mv[2].bit_count() + (board.kings & mv[2]).bit_count(), reverse=True)
+        best = -inf if maximizing_player else inf
+        for mv in moves:
+            undo = board.make_move(mv); self.nodes += 1
+            evaluation = self._quiesce(board, alpha, beta, not maximizing_player, ply+1)
+            board.unmake_move(undo)
+            if maximizing_player:
+                best = max(best, evaluation); alpha = max(alpha, evaluation)
+            else:
+                best = min(best, evaluation); beta = min(beta, evaluation)
+            if beta <= alpha: break
+        return best
+
+    def _probe_tablebase(self, board, color, maximizing_player):
+        if board.red_left + board.black_left > self.tablebase.max_pieces: return None
+        value = self.tablebase.probe(board, color)
+        if value is None: return None
+        if self.stats: self.stats.tb_hits += 1
+        return _tablebase_score(value, maximizing_player)
+
+    def _score_moves(self, board, moves, ply, color, tt_move, pv_move):
+        killers = self.killers[ply] if ply < MAX_PLY else (None, None)
+        history = self.history[color]
+        scores = []
+        for mv in moves:
+            src, dst, cap = mv[0], mv[1], mv[2]
+            if mv == tt_move: score = TT_MOVE_SCORE
+            elif mv == pv_move: score = PV_MOVE_SCORE
+            elif cap: score = CAPTURE_SCORE + 2 * cap.bit_count() + (board.kings & cap).bit_count()
+            elif mv == killers[0] or mv == killers[1]: score = KILLER_SCORE
+            else: score = history[src * 32 + dst]
+            scores.append(score)
+        return scores
+
+    def _record_cutoff(self, mv, depth, ply, color, first):
+        if self.stats: self.stats.cutoffs += 1; self.stats.first_cutoffs += first
+        if mv[2]: return
+        if ply < MAX_PLY and self.killers[ply][0] != mv: self.killers[ply] = [mv, self.killers[ply][0]]
+        self.history[color][mv[0] * 32 + mv[1]] += depth * depth
+
+# --- Parallel Root Search ---
+# Root moves are farmed out to a process pool. The best exact root score found so far lives
+# in shared memory and every job narrows its window with it before starting.
+_worker_searcher, _shared_best = None, None
+
+def _init_parallel_worker(shared_best, tt_mb, tablebase_path, weights):
+    global _worker_searcher, _shared_best
+    _worker_searcher, _shared_best = Searcher(tt_mb, open_tablebase(tablebase_path), Evaluator(weights)), shared_best
+
+def _search_root_move(board, mv, depth, alpha, beta, maximizing_player):
+    searcher = _worker_searcher
+    searcher.pv, searcher.follow_pv, searcher.deadline, searcher.nodes = [], False, inf, 0
+    best = _shared_best.value
+    lo, hi = alpha, beta
+    if maximizing_player and best > -inf: lo = max(alpha, best - TIE_EPS)
+    if not maximizing_player and best < inf: hi = min(beta, best + TIE_EPS)
+    board.make_move(mv)
+    score = searcher._minimax(board, depth-1, lo, hi, not maximizing_player, 1)[0]
+    if lo < score < hi:
+        with _shared_best.get_lock():
+            if (score > _shared_best.value) if maximizing_player else (score < _shared_best.value): _shared_best.value = score
+    return score, searcher.nodes
+
+class ParallelSearcher:
+    def __init__(self, workers=None, tt_mb=DEFAULT_TT_MB, tablebase_path=None, weights=None):
+        ctx = mp.get_context("spawn")
+        self.workers = workers or os.cpu_count() or 1
+        self.shared_best = ctx.Value('d', 0.0)
+        self.evaluator = Evaluator(weights)
+        self.pool = ProcessPoolExecutor(self.workers, mp_context=ctx, initializer=_init_parallel_worker, initargs=(self.shared_best, tt_mb, tablebase_path, weights))
+        self.nodes = 0
+
+    def minimax(self, board, depth, alpha, beta, maximizing_player):
+        color = BLACK if maximizing_player else RED
+        self.nodes = 0
+        if depth == 0: return self.evaluator.evaluate(board), None
+        moves = board.generate_moves(color)
+        if not moves: return _terminal_score(maximizing_player, depth), None
+        self.shared_best.value = -inf if maximizing_player else inf
+
+        # Young brothers wait: the eldest move is searched alone to seed the shared bound.
+        results = [self.pool.submit(_search_root_move, board, moves[0], depth, alpha, beta, maximizing_player).result()]
+        futures = [self.pool.submit(_search_root_move, board, mv, depth, alpha, beta, maximizing_player) for mv in moves[1:]]
+        results += [f.result() for f in futures]
+
+        best, best_idx, best_key = None, None, None
+        for idx, (score, nodes) in enumerate(results):
+            self.nodes += nodes
+            key = _root_key(score, idx, alpha, beta, maximizing_player)
+            if best_key is None or key > best_key: best, best_idx, best_key = score, idx, key
+        return best, _move_path(moves[best_idx])
+
+    def shutdown(self): self.pool.shutdown(cancel_futures=True)
+
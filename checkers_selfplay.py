@@ -0,0 +1,130 @@
+import argparse
+import gzip
+import json
+import multiprocessing as mp
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from math import inf, log10
+from checkers_engine import Board, RED, BLACK, move_to_path, move_to_pdn
+from checkers_eval import Evaluator, DEFAULT_WEIGHTS, MATERIAL_WEIGHTS, load_weights
+from checkers_search import Searcher, DEFAULT_TT_MB
+from checkers_tablebase import open_tablebase
+
+# --- Engine Settings ---
+# An engine is (label, max depth, time budget in ms, evaluation weights). Without a budget it
+# searches the fixed depth, so a game is fully reproducible from its opening seed.
+DEFAULT_MAX_PLIES = 200
+DEFAULT_OPENING_PLIES = 4
+REPETITION_LIMIT = 3
+PRESET_WEIGHTS = {"default": DEFAULT_WEIGHTS, "material": MATERIAL_WEIGHTS}
+
+def parse_engine(spec):
+    # "6", "6:500" or labelled, e.g. "hard=8:2500"; "@material", "@default" or "@weights.json"
+    # at the end picks the evaluation weights.
+    spec, _, weights = spec.partition("@")
+    label, _, setting = spec.rpartition("=")
+    depth, _, time_ms = setting.partition(":")
+    weights = PRESET_WEIGHTS[weights] if weights in PRESET_WEIGHTS else load_weights(weights) if weights else None
+    return label or setting, int(depth), int(time_ms) if time_ms else None, weights
+
+def choose_move(searcher, engine, board, maximizing_player):
+    _, depth, time_ms, _ = engine
+    if time_ms is None: return searcher.minimax(board, depth, -inf, inf, maximizing_player)[1]
+    return searcher.search(board, maximizing_player, depth, time_ms)[1]
+
+# --- Single Game ---
+def random_opening(seed, plies):
+    rng, board, turn, moves = random.Random(seed), Board(), BLACK, []
+    for _ in range(plies):
+        legal = board.legal_moves(turn)
+        if not legal: break
+        moves.append(rng.choice(legal)); board.make_move(moves[-1])
+        turn = RED if turn == BLACK else BLACK
+    return moves
+
+def play_game(game, engines, opening_seed, opening_plies, max_plies, tt_mb, tablebase_path=None):
+    # engines maps BLACK and RED to their settings. Runs in a pool process, no pygame involved.
+    board, turn, moves = Board(), BLACK, []
+    for mv in random_opening(opening_seed, opening_plies):
+        board.make_move(mv); moves.append(move_to_pdn(mv)); turn = RED if turn == BLACK else BLACK
+    tablebase = open_tablebase(tablebase_path)
+    searchers = {color: Searcher(tt_mb, tablebase, Evaluator(engines[color][3])) for color in (BLACK, RED)}
+    nodes, seconds = {BLACK: 0, RED: 0}, {BLACK: 0.0, RED: 0.0}
+    seen = {board.key(turn): 1}
+    winner, reason = None, "ply cap"
+    while len(moves) < max_plies:
+        legal = board.legal_moves(turn)
+        if not legal: winner, reason = (RED if turn == BLACK else BLACK), "no moves"; break
+        start = time.perf_counter()
+        path = choose_move(searchers[turn], engines[turn], board, turn == BLACK)
+        seconds[turn] += time.perf_counter() - start; nodes[turn] += searchers[turn].nodes
+        mv = next(mv for mv in legal if move_to_path(mv) == path)
+        board.make_move(mv); moves.append(move_to_pdn(mv))
+        turn = RED if turn == BLACK else BLACK
+        key = board.key(turn); seen[key] = seen.get(key, 0) + 1
+        if seen[key] >= REPETITION_LIMIT: reason = "repetition"; break
+    return {"game": game, "black": engines[BLACK][0], "red": engines[RED][0], "opening": opening_seed,
+            "result": {BLACK: "black", RED: "red"}.get(winner, "draw"), "reason": reason, "plies": len(moves),
+            "moves": " ".join(moves), "nodes": {"black": nodes[BLACK], "red": nodes[RED]},
+            "seconds": {"black": round(seconds[BLACK], 3), "red": round(seconds[RED], 3)}}
+
+# --- Tournament ---
+def open_results(path):
+    if path == "-": return open(sys.stdout.fileno(), "w", closefd=False)
+    return gzip.open(path, "wt") if path.endswith(".gz") else open(path, "w")
+
+def elo_difference(score, games):
+    p = score / games
+    return inf if p >= 1 else -inf if p <= 0 else -400 * log10(1 / p - 1)
+
+def tournament(engine_a, engine_b, games, workers, out, seed, opening_plies, max_plies, tt_mb, tablebase_path=None):
+    # Each opening is played twice with colours swapped, so neither engine profits from it.
+    # Records are written as one JSON line per game in the order games finish.
+    rng, jobs = random.Random(seed), []
+    for game in range(games):
+        if game % 2 == 0: opening = rng.getrandbits(32)
+        black, red = (engine_a, engine_b) if game % 2 == 0 else (engine_b, engine_a)
+        jobs.append((game, {BLACK: black, RED: red}, opening, opening_plies, max_plies, tt_mb, tablebase_path))
+
+    wins = losses = draws = 0
+    start = time.perf_counter()
+    pool = ProcessPoolExecutor(workers, mp_context=mp.get_context("spawn"))
+    try:
+        with open_results(out) as results:
+            futures = {pool.submit(play_game, *job): job[0] for job in jobs}
+            for done, future in enumerate(as_completed(futures), 1):
+                record = future.result()
+                results.write(json.dumps(record, separators=(",", ":")) + "\n"); results.flush()
+                a_color = "black" if futures[future] % 2 == 0 else "red"
+                if record["result"] == "draw": draws += 1
+                elif record["result"] == a_color: wins += 1
+                else: losses += 1
+                print(f"\r{done}/{games} games  {engine_a[0]} +{wins} -{losses} ={draws}", end="", file=sys.stderr, flush=True)
+    except KeyboardInterrupt:
+        pool.shutdown(wait=False, cancel_futures=True); raise
+    pool.shutdown()
+    played = wins + losses + draws
+    print(file=sys.stderr)
+    print(f"{engine_a[0]} vs {engine_b[0]}: +{wins} -{losses} ={draws} in {played} games, {time.perf_counter() - start:.1f}s")
+    if played: print(f"score {(wins + draws / 2) / played:.1%}, Elo difference {elo_difference(wins + draws / 2, played):+.0f}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless AI-vs-AI self-play tournament")
+    parser.add_argument("engine_a", type=parse_engine, help='engine settings "depth[:time_ms]", optionally "label=depth[:time_ms][@weights]" with weights "material", "default" or a JSON file')
+    parser.add_argument("engine_b", type=parse_engine)
+    parser.add_argument("--games", type=int, default=100)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--out", default="selfplay.jsonl", help='results file, gzipped if it ends in .gz, "-" for stdout')
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--opening-plies", type=int, default=DEFAULT_OPENING_PLIES, help="random plies played before the engines take over")
+    parser.add_argument("--max-plies", type=int, default=DEFAULT_MAX_PLIES, help="games reaching this length are drawn")
+    parser.add_argument("--tt-mb", type=int, default=DEFAULT_TT_MB)
+    parser.add_argument("--tablebase", help="endgame tablebase file for both engines")
+    args = parser.parse_args()
+    tournament(args.engine_a, args.engine_b, args.games, args.workers, args.out, args.seed, args.opening_plies, args.max_plies, args.tt_mb, args.tablebase)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+import argparse
+import mmap
+import os
+import struct
+import sys
+import time
+from array import array
+from itertools import combinations, product
+from math import comb, inf
+from checkers_engine import Board, RED, BLACK
+
+# --- File Layout ---
+# A header, a directory with one record per material signature, then one table of signed
+# 16-bit values per signature. A value is seen from the side to move: +n wins and -n loses
+# in n-1 plies, 0 is a draw (and fills slots of impossible placements).
+TB_MAGIC, TB_VERSION = b"CKTB", 1
+DEFAULT_TB_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "checkers_tb.bin")
+DEFAULT_TB_PIECES = 4
+HEADER = struct.Struct("<4sHHI")  # magic, version, max pieces, number of tables
+TABLE = struct.Struct("<4BQI")    # signature, byte offset, entries
+VALUE = struct.Struct("<h")
+BINOM = [[comb(n, k) for k in range(13)] for n in range(33)]
+
+# --- Indexing ---
+# A signature counts (black men, black kings, red men, red kings). Within its table each group
+# is ranked as a square set in the combinatorial number system, and the side to move is the
+# lowest digit. Overlapping placements get an index too, they are simply never used.
+def signature(black, red, kings):
+    return (black & ~kings).bit_count(), (black & kings).bit_count(), (red & ~kings).bit_count(), (red & kings).bit_count()
+
+def table_size(sig):
+    size = 2
+    for n in sig: size *= BINOM[32][n]
+    return size
+
+def _rank(mask):
+    rank = i = 0
+    while mask:
+        low = mask & -mask; i += 1
+        rank += BINOM[low.bit_length() - 1][i]; mask ^= low
+    return rank
+
+def position_index(black, red, kings, turn):
+    index = 0
+    for group in (black & ~kings, black & kings, red & ~kings, red & kings):
+        index = index * BINOM[32][group.bit_count()] + _rank(group)
+    return index * 2 + (turn == BLACK)
+
+# --- Probing ---
+class Tablebase:
+    def __init__(self, path=DEFAULT_TB_PATH):
+        # The file is mapped read-only: opening is instant and every process reading it shares
+        # the same pages through the OS cache.
+        with open(path, "rb") as f: self.mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.max_pieces, count = HEADER.unpack_from(self.mm, 0)
+        if magic != TB_MAGIC or version != TB_VERSION: raise ValueError(f"{path} is not a checkers tablebase")
+        self.offsets = {}
+        for i in range(count):
+            *sig, offset, _ = TABLE.unpack_from(self.mm, HEADER.size + i * TABLE.size)
+            self.offsets[tuple(sig)] = offset
+
+    def probe(self, board, turn):
+        # Value for the side to move, or None when the position is not covered.
+        offset = self.offsets.get(signature(board.black, board.red, board.kings))
+        if offset is None: return None
+        return VALUE.unpack_from(self.mm, offset + 2 * position_index(board.black, board.red, board.kings, turn))[0]
+
+    def close(self): self.mm.close()
+
+def open_tablebase(path=DEFAULT_TB_PATH):
+    return Tablebase(path) if path and os.path.exists(path) else None
+
+# --- Generation ---
+BLACK_MAN_SQUARES = range(0, 28)  # men never stand on their own crowning row
+RED_MAN_SQUARES = range(4, 32)
+KING_SQUARES = range(32)
+
+def signatures(max_pieces):
+    # Both sides on the board, ordered so that captures and promotions only lead into tables
+    # that are already solved: fewer pieces first, then fewer men.
+    sigs = [sig for sig in product(range(max_pieces + 1), repeat=4)
+            if sig[0] + sig[1] and sig[2] + sig[3] and sum(sig) <= max_pieces]
+    return sorted(sigs, key=lambda sig: (sum(sig), sig[0] + sig[2], sig))
+
+def _placements(groups, used=0):
+    if not groups:
+        yield (); return
+    (count, squares), rest = groups[0], groups[1:]
+    for combo in combinations([sq for sq in squares if not used >> sq & 1], count):
+        mask = sum(1 << sq for sq in combo)
+        for tail in _placements(rest, used | mask): yield (mask,) + tail
+
+def solve_table(sig, solved):
+    # Retrograde solution. Moves leaving the table (captures, promotions) take their values
+    # from tables already solved; results inside it are propagated from each decided position
+    # to its parents in order of distance, so every win is the fastest and every loss the
+    # slowest. Whatever is never decided is a draw.
+    values = array("h", bytes(2 * table_size(sig)))
+    board = Board.__new__(Board); board._legal_cache = {}; board.hash = 0
+    groups = ((sig[0], BLACK_MAN_SQUARES), (sig[1], KING_SQUARES), (sig[2], RED_MAN_SQUARES), (sig[3], KING_SQUARES))
+    parents, remaining, lose_floor, buckets = {}, {}, {}, {}
+    for black_men, black_kings, red_men, red_kings in _placements(groups):
+        black, red, kings = black_men | black_kings, red_men | red_kings, black_kings | red_kings
+        for turn in (BLACK, RED):
+            board.black, board.red, board.kings = black, red, kings; board.update_counts()
+            index, opponent = position_index(black, red, kings, turn), RED if turn == BLACK else BLACK
+            moves = board.generate_moves(turn)
+            if not moves: buckets.setdefault(1, []).append((index, -1)); continue
+            inside, win_at, lose_at = 0, inf, 0
+            for mv in moves:
+                undo = board.make_move(mv)
+                child_sig = signature(board.black, board.red, board.kings)
+                if child_sig == sig:
+                    parents.setdefault(position_index(board.black, board.red, board.kings, opponent), []).append(index); inside += 1
+                else:
+                    if not (board.black if opponent == BLACK else board.red): value = -1  # nothing left to move
+                    else: value = solved[child_sig][position_index(board.black, board.red, board.kings, opponent)]
+                    if value < 0: win_at = min(win_at, -value)
+                    elif value == 0: lose_at = inf  # a drawn escape: this position is never lost
+                    else: lose_at = max(lose_at, value)
+                board.unmake_move(undo)
+            if win_at < inf: lose_at = inf; buckets.setdefault(win_at + 1, []).append((index, win_at + 1))
+            remaining[index], lose_floor[index] = inside, lose_at
+            if not inside and lose_at < inf: buckets.setdefault(lose_at + 1, []).append((index, -(lose_at + 1)))
+
+    # Bucket n holds positions decided in n-1 plies; a value is kept the first time it is set.
+    n = 1
+    while buckets:
+        for index, value in buckets.pop(n, ()):
+            if values[index]: continue
+            values[index] = value
+            for parent in parents.get(index, ()):
+                if values[parent]: continue
+                if value < 0: buckets.setdefault(n + 1, []).append((parent, n + 1))
+                else:
+                    remaining[parent] -= 1
+                    if not remaining[parent] and lose_floor[parent] < inf:
+                        loss = max(n, lose_floor[parent]) + 1
+                        buckets.setdefault(loss, []).append((parent, -loss))
+        n += 1
+    return values
+
+def generate(path, max_pieces, verbose=True):
+    solved, start = {}, time.perf_counter()
+    for sig in signatures(max_pieces):
+        solved[sig] = solve_table(sig, solved)
+        if verbose:
+            decided = sum(1 for v in solved[sig] if v)
+            print(f"  {sig}: {len(solved[sig])} entries, {decided} decided, {time.perf_counter() - start:.1f}s", file=sys.stderr)
+    offset = HEADER.size + TABLE.size * len(solved)
+    with open(path, "wb") as f:
+        f.write(HEADER.pack(TB_MAGIC, TB_VERSION, max_pieces, len(solved)))
+        for sig, values in solved.items():
+            f.write(TABLE.pack(*sig, offset, len(values))); offset += 2 * len(values)
+        for values in solved.values():
+            if sys.byteorder != "little": values.byteswap()
+            values.tofile(f)
+
+def describe(value):
+    if value is None: return "not in tablebase"
+    if value == 0: return "draw"
+    return f"{'win' if value > 0 else 'loss'} in {abs(value) - 1} plies for the side to move"
+
+def main():
+    parser = argparse.ArgumentParser(description="Checkers endgame tablebase")
+    sub = parser.add_subparsers(dest="command", required=True)
+    gen = sub.add_parser("generate", help="solve every position with up to N pieces")
+    gen.add_argument("--pieces", type=int, default=DEFAULT_TB_PIECES)
+    gen.add_argument("--out", default=DEFAULT_TB_PATH)
+    probe = sub.add_parser("probe", help="look up a position given as PDN FEN")
+    probe.add_argument("fen")
+    probe.add_argument("--tablebase", default=DEFAULT_TB_PATH)
+    args = parser.parse_args()
+    if args.command == "generate":
+        generate(args.out, args.pieces)
+        print(f"wrote {args.out} ({os.path.getsize(args.out)} bytes)")
+    elif args.command == "probe":
+        board, turn = Board.from_fen(args.fen)
+        print(describe(Tablebase(args.tablebase).probe(board, turn)))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+import multiprocessing as mp
+from concurrent.futures import ProcessPoolExecutor
+from checkers_search import Searcher, SearchStats
+from checkers_tablebase import open_tablebase
+
+# --- Worker Process Side ---
+# One long-lived process owns the Searcher, so its transposition table survives between
+# turns. A job is abandoned as soon as its id is at or below the shared cancel counter.
+_searcher, _cancelled, _game_id = None, None, None
+
+def _init_worker(cancelled, stats):
+    global _searcher, _cancelled
+    _searcher, _cancelled = Searcher(tablebase=open_tablebase()), cancelled
+    if stats: _searcher.stats = SearchStats()
+
+def _run_search(job_id, game_id, board, maximizing_player, depth, time_ms):
+    global _game_id
+    if game_id != _game_id: _searcher.new_game(); _game_id = game_id
+    _searcher.should_stop = lambda: _cancelled.value >= job_id
+    result = _searcher.search(board, maximizing_player, depth, time_ms)
+    return result, _searcher.completed_depth, _searcher.stats
+
+# --- Main Process Side ---
+class AIWorker:
+    def __init__(self, stats=False):
+        ctx = mp.get_context("spawn")
+        self.cancelled = ctx.Value('i', 0, lock=False)
+        self.pool = ProcessPoolExecutor(max_workers=1, mp_context=ctx, initializer=_init_worker, initargs=(self.cancelled, stats))
+        self.job_id, self.future = 0, None
+        self.last_depth = 0  # depth the last finished search completed
+        self.last_stats = None  # SearchStats of the last finished search when stats are on
+
+    @property
+    def busy(self): return self.future is not None
+
+    def submit(self, board, maximizing_player, depth, time_ms, game_id):
+        self.cancel()
+        self.job_id += 1
+        self.future = self.pool.submit(_run_search, self.job_id, game_id, board.clone(), maximizing_player, depth, time_ms)
+
+    def poll(self):
+        if self.future is None or not self.future.done(): return None
+        future, self.future = self.future, None
+        result, self.last_depth, self.last_stats = future.result()
+        return result
+
+    def cancel(self):
+        if self.future is None: return
+        self.cancelled.value = self.job_id
+        self.future.cancel(); self.future = None
+
+    def shutdown(self):
+        self.cancel()
+        self.pool.shutdown(wait=False, cancel_futures=True)